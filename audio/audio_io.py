@@ -0,0 +1,108 @@
+import os
+import wave
+import numpy as np
+from typing import Optional, Tuple
+from config.settings import Settings
+
+try:
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDFILE_AVAILABLE = False
+
+FORMAT_EXTENSIONS = {
+    "WAV": "wav",
+    "FLAC": "flac",
+    "OPUS": "opus",
+}
+
+# soundfile (major format, subtype) for each compressed recording format
+SOUNDFILE_FORMATS = {
+    "FLAC": ("FLAC", "PCM_16"),
+    "OPUS": ("OGG", "OPUS"),
+}
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.opus', '.ogg', '.mp3', '.m4a')
+
+def get_recording_format(audio_format: str = Settings.AUDIO_FORMAT) -> str:
+    audio_format = audio_format.upper()
+    if audio_format not in FORMAT_EXTENSIONS:
+        print(f"Unknown audio format {audio_format}, recording WAV")
+        return "WAV"
+    if audio_format != "WAV" and not SOUNDFILE_AVAILABLE:
+        print(f"soundfile not installed, recording WAV instead of {audio_format}")
+        return "WAV"
+    return audio_format
+
+def get_recording_extension(audio_format: str = Settings.AUDIO_FORMAT) -> str:
+    return FORMAT_EXTENSIONS[get_recording_format(audio_format)]
+
+def is_wav(file_path: str) -> bool:
+    return file_path.lower().endswith('.wav')
+
+def get_duration(file_path: str) -> Optional[float]:
+    if is_wav(file_path):
+        with wave.open(file_path, 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+
+    if not SOUNDFILE_AVAILABLE:
+        raise RuntimeError(f"soundfile is required to read {os.path.splitext(file_path)[1]} files")
+    return soundfile.info(file_path).duration
+
+def read_pcm(file_path: str) -> Tuple[np.ndarray, int]:
+    """Decode a recording to mono int16 samples and its sample rate"""
+    if is_wav(file_path):
+        with wave.open(file_path, 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError(f"Unsupported sample width in {file_path}")
+            channels = wav_file.getnchannels()
+            sample_rate = wav_file.getframerate()
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return samples, sample_rate
+
+    if not SOUNDFILE_AVAILABLE:
+        raise RuntimeError(f"soundfile is required to read {os.path.splitext(file_path)[1]} files")
+
+    samples, sample_rate = soundfile.read(file_path, dtype='int16', always_2d=True)
+    if samples.shape[1] > 1:
+        return samples.mean(axis=1).astype(np.int16), sample_rate
+    return samples[:, 0].copy(), sample_rate
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Linear interpolation; good enough for playing speech, not for analysis"""
+    if from_rate == to_rate or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * to_rate / float(from_rate)))
+    positions = np.arange(count) * (from_rate / float(to_rate))
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+def write_pcm(file_path: str, samples: np.ndarray, sample_rate: int):
+    """Write mono int16 samples, replacing file_path atomically"""
+    extension = os.path.splitext(file_path)[1]
+    # The .tmp suffix keeps half-written files out of get_all_audio_files()
+    temp_path = file_path + ".tmp"
+
+    try:
+        if is_wav(file_path):
+            with wave.open(temp_path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                wav_file.writeframes(samples.astype(np.int16).tobytes())
+        else:
+            if not SOUNDFILE_AVAILABLE:
+                raise RuntimeError(f"soundfile is required to write {extension} files")
+            audio_format = extension.lstrip('.').upper()
+            major, subtype = SOUNDFILE_FORMATS.get(audio_format, (audio_format, None))
+            soundfile.write(temp_path, samples, sample_rate, format=major, subtype=subtype)
+
+        with open(temp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
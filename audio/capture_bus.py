@@ -0,0 +1,279 @@
+import threading
+import time
+import numpy as np
+from typing import Optional, Dict, Any
+from config.settings import Settings
+
+class CaptureSubscription:
+    def __init__(self, bus: 'AudioCaptureBus', frame_size: int, position: int):
+        self.bus = bus
+        self.frame_size = frame_size
+        self.position = position
+        self.overruns = 0
+        self.data_ready = threading.Event()
+
+    def read(self, timeout: Optional[float] = None, copy: bool = True) -> Optional[np.ndarray]:
+        return self.bus.read(self, timeout, copy)
+
+    def lag_samples(self) -> int:
+        return self.bus.write_position - self.position
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class AudioCaptureBus:
+    """Single microphone stream shared by every consumer through a ring buffer.
+
+    The capture side is the only writer. It fills the ring and then publishes
+    the new write position; each subscriber keeps its own read position, so
+    readers never block the writer or each other.
+
+    In callback mode PortAudio delivers each buffer to _stream_callback, which
+    copies it straight into the preallocated ring. Otherwise a capture thread
+    does blocking reads.
+    """
+
+    def __init__(self, sample_rate: int = Settings.SAMPLE_RATE,
+                 chunk_size: int = Settings.CHUNK_SIZE,
+                 ring_seconds: float = Settings.CAPTURE_RING_SECONDS,
+                 callback_mode: bool = Settings.CAPTURE_CALLBACK_MODE):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.callback_mode = callback_mode
+        # A whole number of chunks, so frames that divide the chunk size never wrap
+        self.capacity = -(-int(ring_seconds * sample_rate) // chunk_size) * chunk_size
+        self.ring = np.zeros(self.capacity, dtype=np.int16)
+        self.ring_bytes = memoryview(self.ring).cast('B')
+        self.write_position = 0
+
+        # Counters for spotting when the Pi falls behind
+        self.buffers_captured = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.reader_overruns = 0
+        self.max_callback_seconds = 0.0
+
+        self.subscribers = ()
+        self.subscribers_lock = threading.Lock()
+
+        self.pyaudio = None
+        self.audio = None
+        self.stream = None
+        self.capture_thread = None
+        self.running = False
+
+    def start(self) -> bool:
+        if self.running:
+            return True
+
+        import pyaudio
+
+        self.pyaudio = pyaudio
+        self.running = True
+        try:
+            self.audio = pyaudio.PyAudio()
+            self.stream = self.audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.sample_rate,
+                input=True,
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._stream_callback if self.callback_mode else None
+            )
+        except Exception as e:
+            print(f"Error opening capture stream: {e}")
+            self.running = False
+            if self.audio:
+                self.audio.terminate()
+                self.audio = None
+            return False
+
+        if not self.callback_mode:
+            self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self.capture_thread.start()
+
+        mode = "callback" if self.callback_mode else "blocking"
+        print(f"Audio capture bus started ({mode} mode)")
+        return True
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join()
+
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.audio:
+            self.audio.terminate()
+            self.audio = None
+
+        # Wake any readers still waiting so they can see the bus is down
+        for subscriber in self.subscribers:
+            subscriber.data_ready.set()
+
+        print("Audio capture bus stopped")
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def _stream_callback(self, in_data, frame_count, time_info, status_flags):
+        pyaudio = self.pyaudio
+        started = time.perf_counter()
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self.input_underflows += 1
+
+        if in_data:
+            self.write_bytes(in_data)
+
+        elapsed = time.perf_counter() - started
+        if elapsed > self.max_callback_seconds:
+            self.max_callback_seconds = elapsed
+
+        return (None, pyaudio.paContinue if self.running else pyaudio.paComplete)
+
+    def _capture_loop(self):
+        # Raising on overflow would throw away the chunk that was read, so
+        # overflows are estimated instead: input piling up to the depth of the
+        # host buffer means the oldest audio is being overwritten
+        try:
+            buffered = int(self.stream.get_input_latency() * self.sample_rate)
+        except Exception:
+            buffered = 0
+        full = max(buffered, 2 * self.chunk_size)
+
+        while self.running:
+            try:
+                if self.stream.get_read_available() >= full:
+                    self.input_overflows += 1
+                data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+                self.write_bytes(data)
+            except Exception as e:
+                if self.running:
+                    print(f"Error in audio capture: {e}")
+
+    def write_bytes(self, data: bytes):
+        # Copy raw int16 PCM into the ring without creating intermediate arrays
+        count = len(data) // 2
+        if count > self.capacity:
+            self.write(np.frombuffer(data, dtype=np.int16))
+            return
+
+        start = self.write_position % self.capacity
+        first = min(count, self.capacity - start)
+        self.ring_bytes[start * 2:(start + first) * 2] = data[:first * 2]
+        if first < count:
+            self.ring_bytes[:(count - first) * 2] = data[first * 2:count * 2]
+
+        self._publish(count)
+
+    def write(self, samples: np.ndarray):
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            self.write_position += count - self.capacity
+            count = self.capacity
+
+        start = self.write_position % self.capacity
+        first = min(count, self.capacity - start)
+        self.ring[start:start + first] = samples[:first]
+        if first < count:
+            self.ring[:count - first] = samples[first:]
+
+        self._publish(count)
+
+    def _publish(self, count: int):
+        # Publish only after the samples are in place
+        self.write_position += count
+        self.buffers_captured += 1
+
+        for subscriber in self.subscribers:
+            subscriber.data_ready.set()
+
+    def subscribe(self, frame_size: int, preroll_seconds: float = 0.0,
+                  start_position: Optional[int] = None) -> CaptureSubscription:
+        if start_position is None:
+            start_position = self.write_position - int(preroll_seconds * self.sample_rate)
+
+        # Never start further back than the ring still holds
+        oldest = self.write_position - self.capacity + self.chunk_size
+        position = max(0, oldest, min(start_position, self.write_position))
+
+        subscription = CaptureSubscription(self, frame_size, position)
+        with self.subscribers_lock:
+            self.subscribers = self.subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: CaptureSubscription):
+        with self.subscribers_lock:
+            self.subscribers = tuple(s for s in self.subscribers if s is not subscription)
+        subscription.data_ready.set()
+
+    def read(self, subscription: CaptureSubscription, timeout: Optional[float] = None,
+             copy: bool = True) -> Optional[np.ndarray]:
+        """Next frame for the subscriber, or None on timeout or when stopped.
+
+        With copy=False a frame that does not wrap is returned as a view into
+        the ring. It stays valid until the writer laps it, so the caller has
+        to finish with it well within CAPTURE_RING_SECONDS.
+        """
+        frame_size = subscription.frame_size
+
+        while True:
+            subscription.data_ready.clear()
+
+            available = self.write_position - subscription.position
+            if available > self.capacity - self.chunk_size:
+                # Reader fell behind far enough that the writer lapped it
+                subscription.position = self.write_position - (self.capacity - self.chunk_size)
+                subscription.overruns += 1
+                self.reader_overruns += 1
+                available = self.write_position - subscription.position
+
+            if available >= frame_size:
+                start = subscription.position % self.capacity
+                end = start + frame_size
+                if end <= self.capacity:
+                    frame = self.ring[start:end]
+                    if copy:
+                        frame = frame.copy()
+                else:
+                    frame = np.concatenate((self.ring[start:], self.ring[:end - self.capacity]))
+                subscription.position += frame_size
+                return frame
+
+            if not self.running:
+                return None
+
+            if not subscription.data_ready.wait(timeout):
+                return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'mode': "callback" if self.callback_mode else "blocking",
+            'running': self.running,
+            'buffers_captured': self.buffers_captured,
+            'seconds_captured': self.write_position / float(self.sample_rate),
+            'input_overflows': self.input_overflows,
+            'input_underflows': self.input_underflows,
+            'reader_overruns': self.reader_overruns,
+            'max_callback_ms': self.max_callback_seconds * 1000.0,
+            'subscribers': len(self.subscribers),
+        }
+
+def get_capture_bus() -> Optional[AudioCaptureBus]:
+    if Settings.MOCK_MODE:
+        return None
+
+    try:
+        import pyaudio
+        return AudioCaptureBus()
+    except Exception as e:
+        print(f"Shared audio capture not available: {e}")
+        return None
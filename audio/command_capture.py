@@ -0,0 +1,145 @@
+import threading
+import time
+import numpy as np
+from typing import Callable, Optional
+from config.settings import Settings
+from audio.capture_bus import AudioCaptureBus
+from audio.metrics import LatencyHistogram
+from audio.vad import VoiceActivityDetector
+
+class CommandCapture:
+    """Captures the spoken command after the wake word and ends it by VAD.
+
+    The utterance is read from the shared capture bus starting where the wake
+    word ended, so nothing said right after it is lost. Once speech has been
+    followed by COMMAND_ENDPOINT_SILENCE of quiet the audio is transcribed and
+    handed to command_callback(text, speech_end_time).
+    """
+
+    def __init__(self, capture_bus: AudioCaptureBus, speech_processor, command_callback: Callable):
+        self.capture_bus = capture_bus
+        self.speech_processor = speech_processor
+        self.command_callback = command_callback
+        self.capturing = False
+        self.capture_thread = None
+        self.cancelled: Optional[threading.Event] = None
+
+        self.max_samples = int(Settings.COMMAND_MAX_SECONDS * capture_bus.sample_rate)
+
+        self.endpoint_delay = LatencyHistogram("command end of speech to endpoint")
+        self.transcription_time = LatencyHistogram("command transcription")
+        self.command_latency = LatencyHistogram("command end of speech to execution")
+
+    def start(self, start_position: Optional[int] = None) -> bool:
+        if self.capturing:
+            print("Already capturing a command")
+            return False
+
+        if not self.capture_bus.is_running():
+            print("Cannot capture command: audio capture is not running")
+            return False
+
+        subscription = self.capture_bus.subscribe(
+            Settings.CHUNK_SIZE,
+            preroll_seconds=Settings.COMMAND_PREROLL_SECONDS,
+            start_position=start_position
+        )
+
+        # Each capture gets its own cancel flag so a cancelled one still winding
+        # down cannot be mistaken for the next
+        self.cancelled = threading.Event()
+        self.capturing = True
+        self.capture_thread = threading.Thread(
+            target=self._capture_command, args=(subscription, self.cancelled)
+        )
+        self.capture_thread.start()
+        return True
+
+    def cancel(self):
+        # Never joins: this is called from state callbacks that hold the state lock
+        if self.cancelled:
+            self.cancelled.set()
+        self.capturing = False
+
+    def _capture_command(self, subscription, cancelled: threading.Event):
+        buffer = np.empty(self.max_samples, dtype=np.int16)
+        sample_rate = float(self.capture_bus.sample_rate)
+        vad = VoiceActivityDetector(sample_rate=self.capture_bus.sample_rate)
+        no_speech_samples = int(Settings.COMMAND_NO_SPEECH_TIMEOUT * sample_rate)
+        endpoint_samples = int(Settings.COMMAND_ENDPOINT_SILENCE * sample_rate)
+        captured = 0
+        speech_end_time = None
+
+        try:
+            while not cancelled.is_set():
+                chunk = subscription.read(timeout=0.5)
+                if chunk is None:
+                    if not self.capture_bus.is_running():
+                        break
+                    continue
+
+                count = min(len(chunk), self.max_samples - captured)
+                buffer[captured:captured + count] = chunk[:count]
+                captured += count
+                vad.process(chunk[:count])
+
+                if not vad.speech_detected:
+                    if captured >= no_speech_samples:
+                        print("No command heard")
+                        break
+                    continue
+
+                if vad.silence_samples >= endpoint_samples or captured >= self.max_samples:
+                    # Speech ended this long ago, counting audio still queued behind us
+                    now = time.perf_counter()
+                    behind = (vad.silence_samples + subscription.lag_samples()) / sample_rate
+                    speech_end_time = now - behind
+                    self.endpoint_delay.record(now - speech_end_time)
+                    break
+        finally:
+            subscription.close()
+
+        if cancelled.is_set():
+            # Whoever cancelled has already moved on
+            return
+
+        self.capturing = False
+        if speech_end_time is None:
+            self._deliver(None, None)
+            return
+
+        pad = int(0.1 * sample_rate)
+        audio = buffer[:min(captured, vad.last_speech_end + pad)]
+
+        started = time.perf_counter()
+        text = self.speech_processor.transcribe_audio_data(audio.tobytes(), int(sample_rate))
+        self.transcription_time.record(time.perf_counter() - started)
+        print(f"Command heard: {text}")
+
+        self._deliver(text, speech_end_time)
+
+    def _deliver(self, text: Optional[str], speech_end_time: Optional[float]):
+        try:
+            self.command_callback(text, speech_end_time)
+        except Exception as e:
+            print(f"Error in command callback: {e}")
+
+    def record_command_executed(self, speech_end_time: Optional[float]):
+        if speech_end_time is None:
+            return
+        latency = time.perf_counter() - speech_end_time
+        self.command_latency.record(latency)
+        print(f"Command latency from end of speech: {latency * 1000:.0f}ms")
+
+    def get_stats(self) -> dict:
+        return {
+            'endpoint_delay': self.endpoint_delay.summary(),
+            'transcription_time': self.transcription_time.summary(),
+            'command_latency': self.command_latency.summary(),
+        }
+
+def get_command_capture(capture_bus: Optional[AudioCaptureBus], speech_processor,
+                        command_callback: Callable) -> Optional[CommandCapture]:
+    if capture_bus is None:
+        return None
+    return CommandCapture(capture_bus, speech_processor, command_callback)
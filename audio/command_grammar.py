@@ -0,0 +1,272 @@
+import re
+from typing import Dict, List, Optional, Tuple, Iterable
+from config.settings import Settings
+from config.family_names import FAMILY_MEMBERS
+
+# Intents in priority order: when an utterance matches several, the first wins
+INTENT_PHRASES = [
+    ("record", ["remember this", "record this", "save this", "remember", "record"]),
+    ("skip", ["skip", "next", "next one"]),
+    ("previous", ["previous", "go back", "last one"]),
+    ("pause", ["pause", "hold on"]),
+    ("resume", ["resume", "continue", "keep going", "unpause"]),
+    ("play", ["play", "hear", "listen to", "listen"]),
+    ("stop", ["stop", "enough", "cancel", "quit"]),
+    ("list", ["list", "show", "what do you have"]),
+    ("help", ["help", "what can you do", "commands"]),
+]
+
+WAKE_WORDS = {"muninn", "munin"}
+
+# An utterance that opens with one of these is that request whatever follows,
+# so "play the last one" plays rather than going back; only the listed
+# intents still outrank it
+LEADING_INTENTS = {"play": {"record"}}
+
+# Words too common to be worth comparing against the roster
+FILLER_WORDS = {
+    "a", "all", "an", "and", "for", "from", "her", "his", "is", "me", "message",
+    "messages", "my", "of", "please", "some", "the", "their", "to", "too", "what",
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+# Sounds a recognizer confuses get the same symbol: "sassy" and "cassie" share a key
+_PHONETIC_RULES = [
+    (re.compile(r"[^a-z]"), ""),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"(?:ch|sh)"), "x"),
+    (re.compile(r"th"), "t"),
+    (re.compile(r"[ckqsz]"), "s"),
+    (re.compile(r"[gj](?=[eiy])"), "j"),
+    (re.compile(r"dg"), "j"),
+    (re.compile(r"[wh]"), ""),
+]
+_VOWELS_RE = re.compile(r"[aeiouy]+")
+_REPEATS_RE = re.compile(r"(.)\1+")
+
+# Spellings that sound the same are written the same, vowels kept: "kerry"
+# and "carrie" become "kery" and "kary", while "nice" and "nick" stay apart
+_SPELLING_RULES = [
+    (re.compile(r"[^a-z]"), ""),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"ch"), "x"),
+    (re.compile(r"ck"), "k"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"[cq]"), "k"),
+    (re.compile(r"(?:ie|ey|ee|i)$"), "y"),
+    (re.compile(r"(?<=[a-z]{2}[^aeiouy])e$"), ""),
+]
+
+def phonetic_key(word: str) -> str:
+    """Consonant skeleton of a word with confusable sounds merged"""
+    word = word.lower()
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    if not word:
+        return ""
+    # Keep a leading vowel so "allie" and "lyra" stay apart
+    head = "a" if word[0] in "aeiouy" else ""
+    return head + _REPEATS_RE.sub(r"\1", _VOWELS_RE.sub("", word))
+
+def spelling_key(word: str) -> str:
+    """Spelling with silent letters and alternative spellings of a sound evened out"""
+    word = word.lower()
+    for pattern, replacement in _SPELLING_RULES:
+        word = pattern.sub(replacement, word)
+    return _REPEATS_RE.sub(r"\1", word)
+
+def edit_distance(a: str, b: str) -> int:
+    # Names that differ only in the ending are common; skip the shared part
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a, b = a[start:], b[start:]
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def _deletions(key: str) -> List[str]:
+    return list({key[:i] + key[i + 1:] for i in range(len(key))})
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        tokens.append(token.replace("'", ""))
+    return tokens
+
+class CommandMatch:
+    """Result of parsing one utterance.
+
+    candidates holds (member, confidence) pairs best first; member is the
+    top candidate when it clears the confidence threshold.
+    """
+
+    def __init__(self, intent: str, member: Optional[str], confidence: float,
+                 candidates: List[Tuple[str, float]], text: str):
+        self.intent = intent
+        self.member = member
+        self.confidence = confidence
+        self.candidates = candidates
+        self.text = text
+
+    def __repr__(self):
+        return (f"CommandMatch(intent={self.intent!r}, member={self.member!r}, "
+                f"confidence={self.confidence:.2f}, candidates={self.candidates[:3]!r})")
+
+class CommandMatcher:
+    """Intent grammar and family name index, built once and reused per utterance.
+
+    Phrases are matched on whole words, so "bea" never matches inside "beau".
+    Names are looked up by exact spelling first and then through an index of
+    phonetic keys and their one-deletion variants, so only names within one
+    sound of what was heard are ever scored, however long the roster is. The
+    phonetic key merges a lot ("nice" and "nick" share one), so a candidate
+    found that way must also be spelled within min_spelling of the word.
+    """
+
+    def __init__(self, members: Iterable[str] = FAMILY_MEMBERS,
+                 intents: List[Tuple[str, List[str]]] = INTENT_PHRASES,
+                 min_confidence: float = Settings.COMMAND_NAME_MIN_CONFIDENCE,
+                 min_spelling: float = Settings.COMMAND_NAME_MIN_SPELLING,
+                 cache_size: int = 4096):
+        self.min_confidence = min_confidence
+        self.min_spelling = min_spelling
+        self.intent_count = len(intents)
+        self.cache_size = cache_size
+        self.token_cache: Dict[str, List[Tuple[str, float]]] = {}
+
+        # first word -> [(phrase words, intent, priority)], longest phrases first
+        self.phrases: Dict[str, List[Tuple[Tuple[str, ...], str, int]]] = {}
+        self.grammar_words = set(WAKE_WORDS) | FILLER_WORDS
+        for priority, (intent, phrases) in enumerate(intents):
+            for phrase in phrases:
+                words = tuple(phrase.split())
+                self.phrases.setdefault(words[0], []).append((words, intent, priority))
+                self.grammar_words.update(words)
+        for entries in self.phrases.values():
+            entries.sort(key=lambda entry: -len(entry[0]))
+
+        self.members: Dict[str, str] = {}  # lowercase spelling -> member
+        self.spellings: Dict[str, str] = {}  # member -> spelling_key()
+        self.key_index: Dict[str, List[str]] = {}  # phonetic key -> members
+        self.deletion_index: Dict[str, List[str]] = {}  # key with one sound dropped -> members
+        for member in members:
+            spelling = member.lower()
+            key = phonetic_key(spelling)
+            self.members[spelling] = member
+            self.spellings[member] = spelling_key(spelling)
+            self.key_index.setdefault(key, []).append(member)
+            for variant in _deletions(key):
+                self.deletion_index.setdefault(variant, []).append(member)
+
+    def match(self, text: str) -> CommandMatch:
+        tokens = tokenize(text)
+        while tokens and tokens[0] in WAKE_WORDS:
+            tokens.pop(0)
+
+        intent, priority = "unknown", self.intent_count
+        leading = None
+        found = set()
+        used = set()
+        index = 0
+        while index < len(tokens):
+            for words, phrase_intent, phrase_priority in self.phrases.get(tokens[index], ()):
+                if tuple(tokens[index:index + len(words)]) == words:
+                    if index == 0:
+                        leading = phrase_intent
+                    found.add(phrase_intent)
+                    if phrase_priority < priority:
+                        intent, priority = phrase_intent, phrase_priority
+                    used.update(range(index, index + len(words)))
+                    index += len(words) - 1
+                    break
+            index += 1
+
+        if leading in LEADING_INTENTS and not found & LEADING_INTENTS[leading]:
+            intent = leading
+
+        scores: Dict[str, float] = {}
+        for position, token in enumerate(tokens):
+            if position in used or token in self.grammar_words:
+                continue
+            for member, confidence in self.match_name(token):
+                if confidence > scores.get(member, 0.0):
+                    scores[member] = confidence
+
+        candidates = sorted(scores.items(), key=lambda item: -item[1])
+        member, confidence = None, 0.0
+        if candidates:
+            confidence = candidates[0][1]
+            if confidence >= self.min_confidence:
+                member = candidates[0][0]
+        return CommandMatch(intent, member, confidence, candidates, " ".join(tokens))
+
+    def match_name(self, token: str) -> List[Tuple[str, float]]:
+        """Family members a single word could be, with confidence 0-1, best first"""
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        candidates = self._score_token(token)
+        if token.endswith("s") and len(token) > 2:
+            # Plurals and possessives without the apostrophe: "carries", "beaus"
+            for member, confidence in self._score_token(token[:-1]):
+                candidates.append((member, confidence * 0.98))
+
+        best: Dict[str, float] = {}
+        for member, confidence in candidates:
+            if confidence > best.get(member, 0.0):
+                best[member] = confidence
+        ranked = sorted(best.items(), key=lambda item: -item[1])
+
+        if self.cache_size:
+            if len(self.token_cache) >= self.cache_size:
+                self.token_cache.clear()
+            self.token_cache[token] = ranked
+        return ranked
+
+    def _score_token(self, token: str) -> List[Tuple[str, float]]:
+        exact = self.members.get(token)
+        if exact:
+            candidates = [(exact, 1.0)]
+        else:
+            candidates = []
+
+        key = phonetic_key(token)
+        if not key:
+            return candidates
+
+        # Same key, one sound missing from the word, or one extra sound in it
+        one_off = 1.0 - 1.0 / (len(key) + 1)
+        nearby = [(self.key_index.get(key, ()), 1.0)]
+        nearby.append((self.deletion_index.get(key, ()), one_off))
+        if len(key) > 1:
+            one_off = 1.0 - 1.0 / len(key)
+            nearby.extend((self.key_index.get(variant, ()), one_off) for variant in _deletions(key))
+
+        heard = spelling_key(token)
+        seen = {exact}
+        for members, key_similarity in nearby:
+            for member in members:
+                if member in seen:
+                    continue
+                seen.add(member)
+                spelling = self.spellings[member]
+                spelling_similarity = 1.0 - edit_distance(heard, spelling) / float(max(len(heard), len(spelling), 1))
+                if spelling_similarity < self.min_spelling:
+                    continue
+                # Sounding right counts as much as being spelled right
+                candidates.append((member, 0.5 * key_similarity + 0.5 * spelling_similarity))
+        return candidates
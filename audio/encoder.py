@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+import numpy as np
+from config.settings import Settings
+from audio.audio_io import SOUNDFILE_FORMATS, get_recording_format
+from audio.wav_writer import StreamingWavWriter
+
+class SoundFileSink:
+    def __init__(self, filename: str, audio_format: str, channels: int, sample_rate: int):
+        import soundfile
+
+        major, subtype = SOUNDFILE_FORMATS[audio_format]
+        self.file = soundfile.SoundFile(
+            filename, 'w',
+            samplerate=sample_rate,
+            channels=channels,
+            format=major,
+            subtype=subtype
+        )
+        self.channels = channels
+
+    def write(self, data: bytes):
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        self.file.write(samples)
+
+    def close(self):
+        self.file.close()
+
+def open_sink(filename: str, audio_format: str, channels: int, sample_rate: int):
+    if audio_format == "WAV":
+        return StreamingWavWriter(filename, channels=channels, sample_width=2, sample_rate=sample_rate)
+    return SoundFileSink(filename, audio_format, channels, sample_rate)
+
+class EncoderStage:
+    """Writes recorded PCM chunks to disk on a worker thread.
+
+    write() only enqueues, so the capture loop never waits on the encoder or
+    the SD card. close() drains the queue and finalizes the file. Only the
+    WAV sink keeps a playable file if Muninn dies mid-recording; FLAC and
+    Opus files are finished by close().
+    """
+
+    def __init__(self, filename: str, audio_format: str = Settings.AUDIO_FORMAT,
+                 channels: int = Settings.CHANNELS, sample_rate: int = Settings.SAMPLE_RATE):
+        self.filename = filename
+        self.audio_format = get_recording_format(audio_format)
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.data_bytes = 0
+        self.max_queue_depth = 0
+        self.cpu_seconds = 0.0
+        self.error = None
+
+        self.sink = open_sink(filename, self.audio_format, channels, sample_rate)
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._encode_loop, daemon=True)
+        self.worker.start()
+
+    def write(self, data: bytes):
+        self.data_bytes += len(data)
+        self.queue.put(data)
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def _encode_loop(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.error is not None:
+                continue
+
+            start = time.thread_time()
+            try:
+                self.sink.write(data)
+            except Exception as e:
+                print(f"Error encoding audio: {e}")
+                self.error = e
+            self.cpu_seconds += time.thread_time() - start
+
+        start = time.thread_time()
+        try:
+            self.sink.close()
+        except Exception as e:
+            print(f"Error finalizing {self.filename}: {e}")
+            self.error = e
+        self.cpu_seconds += time.thread_time() - start
+
+    @property
+    def frames_written(self) -> int:
+        return self.data_bytes // (2 * self.channels)
+
+    @property
+    def duration(self) -> float:
+        return self.frames_written / float(self.sample_rate)
+
+    def close(self):
+        if not self.worker.is_alive():
+            return
+        self.queue.put(None)
+        self.worker.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,69 @@
+import bisect
+import threading
+from typing import Dict, Any, List, Optional
+
+# Bucket upper bounds in seconds, roughly 1-2-5 steps from 10us to 10s
+DEFAULT_BOUNDS = [
+    scale * factor
+    for scale in (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+    for factor in (1, 2, 5)
+] + [10.0]
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations, cheap enough to record per audio frame"""
+
+    def __init__(self, name: str, bounds: Optional[List[float]] = None):
+        self.name = name
+        self.bounds = list(bounds or DEFAULT_BOUNDS)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # Last bucket collects everything above the highest bound
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def record(self, seconds: float):
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        with self.lock:
+            if self.count == 0:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.bounds[index] if index < len(self.bounds) else self.max
+            return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.mean * 1000.0,
+            'p50_ms': self.percentile(0.50) * 1000.0,
+            'p95_ms': self.percentile(0.95) * 1000.0,
+            'p99_ms': self.percentile(0.99) * 1000.0,
+            'max_ms': self.max * 1000.0,
+        }
+
+    def format(self) -> str:
+        stats = self.summary()
+        return (f"{self.name}: n={stats['count']} mean={stats['mean_ms']:.2f}ms "
+                f"p50<={stats['p50_ms']:.2f}ms p95<={stats['p95_ms']:.2f}ms "
+                f"p99<={stats['p99_ms']:.2f}ms max={stats['max_ms']:.2f}ms")
@@ -1,13 +1,207 @@
-import pygame
+import os
+import queue
 import threading
 import time
-from typing import Optional, Callable
+from collections import OrderedDict
+from typing import Optional, Callable, List, Tuple
 from config.settings import Settings
+from audio.audio_io import get_duration
+from audio.metrics import LatencyHistogram
+from audio.track_source import TrackSource, MemoryTrackSource, open_track_source
+
+# pygame's event queue lives in the video subsystem; there is no screen on the Pi
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+PLAYABLE_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.flac', '.opus')
+
+TRACK_END_EVENT = pygame.USEREVENT + 1
+COMMAND_EVENT = pygame.USEREVENT + 2
+
+class CallbackDispatcher:
+    """Runs player callbacks in order on their own thread.
+
+    Callbacks often change state or start new playback, so they must never
+    run on the thread that is driving the audio.
+    """
+
+    def __init__(self, name: str):
+        self.callbacks = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def dispatch(self, callback: Optional[Callable], *args, done: Optional[threading.Event] = None):
+        self.callbacks.put((callback, args, done))
+
+    def _run(self):
+        while True:
+            callback, args, done = self.callbacks.get()
+            try:
+                if callback:
+                    callback(*args)
+            except Exception as e:
+                print(f"Error in playback callback: {e}")
+            finally:
+                if done:
+                    done.set()
+
+    def is_current_thread(self) -> bool:
+        return threading.current_thread() is self.thread
+
+class DecodedAudioCache:
+    """LRU cache of decoded, mixer-ready PCM, bounded by bytes.
+
+    Entries are keyed by path and checked against the file's size and
+    modification time, so a recording rewritten by post-processing is
+    decoded again instead of playing stale audio. Each of evict_listeners
+    is called with the path of every entry dropped, outside the lock.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+        self.evict_listeners: List[Callable[[str], None]] = []
+        self.lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _signature(file_path: str) -> Tuple[int, int]:
+        info = os.stat(file_path)
+        return info.st_size, info.st_mtime_ns
+
+    def get(self, file_path: str) -> Optional[bytes]:
+        try:
+            signature = self._signature(file_path)
+        except OSError:
+            signature = None
+
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if entry is not None and entry[0] == signature:
+                self.entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(file_path)
+            self.misses += 1
+        if entry is not None:
+            self._notify_evicted([file_path])
+        return None
+
+    def contains(self, file_path: str) -> bool:
+        """Like get() but without counting a hit or miss or refreshing the entry"""
+        try:
+            signature = self._signature(file_path)
+        except OSError:
+            return False
+        with self.lock:
+            entry = self.entries.get(file_path)
+            return entry is not None and entry[0] == signature
+
+    def put(self, file_path: str, pcm: bytes, signature: Tuple[int, int]):
+        if len(pcm) > self.max_bytes:
+            return
+
+        evicted = []
+        with self.lock:
+            if file_path in self.entries:
+                self._remove(file_path)
+            while self.entries and self.total_bytes + len(pcm) > self.max_bytes:
+                evicted.append(next(iter(self.entries)))
+                self._remove(evicted[-1])
+                self.evictions += 1
+            self.entries[file_path] = (signature, pcm)
+            self.total_bytes += len(pcm)
+        self._notify_evicted(evicted)
+
+    def _remove(self, file_path: str):
+        _, pcm = self.entries.pop(file_path)
+        self.total_bytes -= len(pcm)
+
+    def _notify_evicted(self, file_paths: List[str]):
+        for file_path in file_paths:
+            for listener in self.evict_listeners:
+                try:
+                    listener(file_path)
+                except Exception as e:
+                    print(f"Error in cache eviction listener: {e}")
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+def player_cache_budget(max_bytes: int = Settings.PLAYER_CACHE_MAX_BYTES,
+                        memory_fraction: float = Settings.PLAYER_CACHE_MAX_MEMORY_FRACTION) -> int:
+    try:
+        physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return max_bytes
+    return min(max_bytes, int(physical * memory_fraction))
+
+class Chunk:
+    """A piece of one track, turned into a Sound and ready for the channel"""
+
+    def __init__(self, index: int, source: TrackSource, start: int, sound, frames: int):
+        self.index = index
+        self.source = source
+        self.start = start  # mixer frames from the start of the track
+        self.sound = sound
+        self.frames = frames
+        self.started_at = None
+
+class PlaylistSession:
+    """Where one play_playlist() call has got to; only the player thread touches it"""
+
+    def __init__(self, file_paths: List[str], completion_callback: Optional[Callable],
+                 track_callback: Optional[Callable], start_positions: Optional[List[float]],
+                 position_callback: Optional[Callable]):
+        self.file_paths = file_paths
+        self.completion_callback = completion_callback
+        self.track_callback = track_callback
+        self.position_callback = position_callback
+        # index -> seconds; used the first time each track is opened
+        self.start_positions = {index: seconds for index, seconds in enumerate(start_positions or [])
+                                if seconds}
+        self.finished = threading.Event()
+
+        self.playing: Optional[Chunk] = None
+        self.queued: Optional[Chunk] = None
+        self.queued_at = None
+        self.paused_at = None
+        self.reported_at = None
 
 class AudioPlayer:
+    """Streams playlists from a single long-lived player thread.
+
+    Each track is read a chunk at a time (PLAYER_CHUNK_SECONDS) from a
+    TrackSource, memory-mapped for WAV, and the next chunk, from this track
+    or the next one, is always queued on the channel so SDL moves on to it
+    with no gap. The thread sleeps in pygame.event.wait() and wakes only for
+    a channel end event or a command from another thread. Because playback
+    is in chunks it can start or seek anywhere in a track, and the position
+    is reported through position_callback so it can be resumed later.
+    Callbacks go through a CallbackDispatcher.
+    """
+
     def __init__(self):
         try:
             pygame.mixer.init(frequency=Settings.SAMPLE_RATE, size=-16, channels=Settings.CHANNELS, buffer=512)
+            self.channel = pygame.mixer.Channel(0)
+            self.frequency, _, self.channels = pygame.mixer.get_init()
+            self.buffer_seconds = 512 / float(self.frequency)
+            self.chunk_frames = int(Settings.PLAYER_CHUNK_SECONDS * self.frequency)
             self.initialized = True
             print("Audio player initialized with pygame")
         except Exception as e:
@@ -15,10 +209,49 @@ class AudioPlayer:
             self.initialized = False
 
         self.is_playing = False
+        self.paused = False
         self.current_file = None
-        self.play_thread = None
-
-    def play_file(self, file_path: str, completion_callback: Optional[Callable] = None) -> bool:
+        self.session: Optional[PlaylistSession] = None
+        # The session of the latest play_playlist(), which may still be queued
+        self.requested_session: Optional[PlaylistSession] = None
+        self.volume = 1.0
+        self.cache = DecodedAudioCache(player_cache_budget())
+
+        self.gaps = LatencyHistogram("gap between chunks")
+        self.read_times = LatencyHistogram("chunk read")
+        self.stop_latency = LatencyHistogram("stop command to silence")
+        self.skip_latency = LatencyHistogram("skip command to next track")
+        self.start_latency = LatencyHistogram("play command to first sound")
+        self.tracks_started = 0
+
+        self.running = False
+        if self.initialized:
+            self.dispatcher = CallbackDispatcher("player-callbacks")
+            ready = threading.Event()
+            self.running = True
+            self.player_thread = threading.Thread(target=self._player_loop, args=(ready,),
+                                                  name="player", daemon=True)
+            self.player_thread.start()
+            if not ready.wait(5.0):
+                print("Player thread did not start")
+                self.initialized = False
+
+    def play_file(self, file_path: str, completion_callback: Optional[Callable] = None,
+                  start_seconds: float = 0.0) -> bool:
+        return self.play_playlist([file_path], completion_callback, start_positions=[start_seconds])
+
+    def play_playlist(self, file_paths: List[str], completion_callback: Optional[Callable] = None,
+                      track_callback: Optional[Callable] = None,
+                      start_positions: Optional[List[float]] = None,
+                      position_callback: Optional[Callable] = None) -> bool:
+        """Play file_paths in order, calling track_callback(index, file_path)
+        as each track starts and completion_callback() once at the end.
+
+        start_positions gives the second to start each track from.
+        position_callback(index, file_path, position, duration) is called
+        every PLAYER_POSITION_SAVE_SECONDS and whenever a track is left, with
+        position equal to duration when it played to the end.
+        """
         if not self.initialized:
             print("Audio player not initialized")
             return False
@@ -27,67 +260,357 @@ class AudioPlayer:
             print("Already playing audio")
             return False
 
-        if not file_path or not file_path.endswith(('.wav', '.mp3', '.ogg')):
-            print(f"Unsupported audio format: {file_path}")
+        starts = list(start_positions or [])
+        starts += [0.0] * (len(file_paths) - len(starts))
+        playable = [(path, start) for path, start in zip(file_paths, starts)
+                    if path and path.lower().endswith(PLAYABLE_EXTENSIONS)]
+        if len(playable) < len(file_paths):
+            print(f"Skipping {len(file_paths) - len(playable)} files in unsupported formats")
+        if not playable:
             return False
 
-        try:
-            self.current_file = file_path
-            self.is_playing = True
-
-            # Start playback in a separate thread
-            self.play_thread = threading.Thread(
-                target=self._play_audio_thread,
-                args=(file_path, completion_callback)
-            )
-            self.play_thread.start()
+        session = PlaylistSession([path for path, _ in playable], completion_callback, track_callback,
+                                  [start for _, start in playable], position_callback)
+        self.requested_session = session
+        self.is_playing = True
+        self.paused = False
+        self._post_command("play", session=session)
+        return True
 
-            print(f"Started playing: {file_path}")
-            return True
+    def _post_command(self, command: str, **kwargs):
+        pygame.event.post(pygame.event.Event(COMMAND_EVENT, command=command,
+                                             posted=time.perf_counter(), **kwargs))
 
+    def _player_loop(self, ready: threading.Event):
+        try:
+            pygame.display.init()
+            self.channel.set_endevent(TRACK_END_EVENT)
         except Exception as e:
-            print(f"Error starting playback: {e}")
-            self.is_playing = False
+            print(f"Error starting player event loop: {e}")
+            self.running = False
+            return
+        ready.set()
+
+        while self.running:
+            event = pygame.event.wait(1000)
+            try:
+                if event.type == COMMAND_EVENT:
+                    self._handle_command(event)
+                elif event.type == TRACK_END_EVENT:
+                    self._handle_track_end()
+            except Exception as e:
+                print(f"Error during playback: {e}")
+                if self.session:
+                    self._finish_session()
+
+    def _open_source(self, file_path: str) -> TrackSource:
+        cached = self.cache.get(file_path)
+        if cached is not None:
+            return MemoryTrackSource(file_path, cached, self.frequency, self.channels)
+
+        signature = DecodedAudioCache._signature(file_path)
+        try:
+            source = open_track_source(file_path, self.frequency, self.channels)
+        except Exception:
+            # Formats audio_io cannot decode (mp3, m4a) are left to SDL_mixer, whole
+            pcm = pygame.mixer.Sound(file_path).get_raw()
+            self.cache.put(file_path, pcm, signature)
+            return MemoryTrackSource(file_path, pcm, self.frequency, self.channels)
+
+        # Keep the whole track once it has been streamed start to finish
+        if source.frames * 2 * self.channels <= self.cache.max_bytes:
+            source.collect(lambda pcm: self.cache.put(file_path, pcm, signature))
+        return source
+
+    def prefetch(self, file_path: str) -> bool:
+        """Decode file_path into the cache ahead of a request, so it starts
+        without touching the disk. Safe to call from any thread."""
+        if not self.initialized:
             return False
+        if self.cache.contains(file_path):
+            return True
 
-    def _play_audio_thread(self, file_path: str, completion_callback: Optional[Callable]):
+        signature = DecodedAudioCache._signature(file_path)
+        source = open_track_source(file_path, self.frequency, self.channels)
         try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy() and self.is_playing:
-                time.sleep(0.1)
+            if source.frames * 2 * self.channels > self.cache.max_bytes:
+                return False
+            pcm = source.read(source.frames)
+        finally:
+            source.close()
+        self.cache.put(file_path, pcm, signature)
+        return True
 
+    def is_cached(self, file_path: str) -> bool:
+        return self.cache.contains(file_path)
+
+    def add_cache_listener(self, callback: Callable[[str], None]):
+        """Call callback(file_path) whenever a decoded file leaves the cache"""
+        self.cache.evict_listeners.append(callback)
+
+    def _read_chunk(self, index: int, source: TrackSource) -> Optional[Chunk]:
+        start = source.position
+        started = time.perf_counter()
+        pcm = source.read(self.chunk_frames)
+        if not pcm:
+            return None
+        sound = pygame.mixer.Sound(buffer=pcm)
+        self.read_times.record(time.perf_counter() - started)
+        return Chunk(index, source, start, sound, len(pcm) // (2 * self.channels))
+
+    def _first_chunk(self, session: PlaylistSession, index: int, step: int = 1) -> Optional[Chunk]:
+        """Opening chunk of the first track from index on (in direction step) that plays"""
+        while 0 <= index < len(session.file_paths):
+            source = None
+            try:
+                source = self._open_source(session.file_paths[index])
+                start_seconds = session.start_positions.pop(index, 0.0)
+                if start_seconds < source.duration - Settings.PLAYER_CHUNK_SECONDS:
+                    source.seek(start_seconds * self.frequency)
+                chunk = self._read_chunk(index, source)
+                if chunk is not None:
+                    return chunk
+            except Exception as e:
+                print(f"Cannot play {session.file_paths[index]}: {e}")
+            if source is not None:
+                source.close()
+            index += step
+        return None
+
+    def _next_chunk(self, session: PlaylistSession, after: Chunk) -> Optional[Chunk]:
+        try:
+            chunk = self._read_chunk(after.index, after.source)
         except Exception as e:
-            print(f"Error during playback: {e}")
-
-        finally:
+            print(f"Error reading {session.file_paths[after.index]}: {e}")
+            chunk = None
+        return chunk or self._first_chunk(session, after.index + 1)
+
+    def _drop_queued(self, session: PlaylistSession):
+        queued = session.queued
+        session.queued = None
+        if queued is not None and (session.playing is None or queued.source is not session.playing.source):
+            queued.source.close()
+
+    def _position(self, session: PlaylistSession, now: Optional[float] = None) -> float:
+        """Seconds into the current track"""
+        chunk = session.playing
+        elapsed = (session.paused_at or now or time.perf_counter()) - chunk.started_at
+        frames = chunk.start + min(chunk.frames, max(0.0, elapsed * self.frequency))
+        return frames / float(self.frequency)
+
+    def _report_position(self, session: PlaylistSession, completed: bool = False):
+        chunk = session.playing
+        if chunk is None or not session.position_callback:
+            return
+        duration = chunk.source.duration
+        position = duration if completed else self._position(session)
+        session.reported_at = time.perf_counter()
+        self.dispatcher.dispatch(session.position_callback, chunk.index,
+                                 session.file_paths[chunk.index], position, duration)
+
+    def _begin(self, session: PlaylistSession, chunk: Chunk, started: float,
+               gap: Optional[float] = None, play: bool = True):
+        """Make chunk the one playing, announce it if it starts a track, and queue the next"""
+        previous = session.playing
+        if play:
+            self.channel.play(chunk.sound)
+            session.paused_at = None
+            self.paused = False
+        if session.queued is chunk:
+            session.queued = None
+        else:
+            self._drop_queued(session)
+        chunk.started_at = started
+        session.playing = chunk
+        if gap is not None:
+            self.gaps.record(gap)
+
+        if previous is None or previous.source is not chunk.source:
+            if previous is not None:
+                previous.source.close()
+            session.reported_at = started
+            self.current_file = session.file_paths[chunk.index]
+            self.tracks_started += 1
+            offset = f" from {chunk.start / float(self.frequency):.1f}s" if chunk.start else ""
+            print(f"Started playing: {self.current_file}{offset}")
+            if session.track_callback:
+                self.dispatcher.dispatch(session.track_callback, chunk.index, self.current_file)
+        elif started - session.reported_at >= Settings.PLAYER_POSITION_SAVE_SECONDS:
+            self._report_position(session)
+
+        # Line up what comes next while this chunk plays
+        session.queued = self._next_chunk(session, chunk)
+        if session.queued is not None:
+            self.channel.queue(session.queued.sound)
+            session.queued_at = time.perf_counter()
+
+    def _finish_session(self):
+        session = self.session
+        self.session = None
+        self.channel.stop()
+        self._drop_queued(session)
+        if session.playing is not None:
+            session.playing.source.close()
+        # A stop handled after the next play_playlist() must not mark that one stopped
+        if self.requested_session is session:
+            self.requested_session = None
             self.is_playing = False
+            self.paused = False
             self.current_file = None
+        print("Playback finished")
+        self.dispatcher.dispatch(session.completion_callback, done=session.finished)
+
+    def _handle_command(self, event):
+        command = event.command
+        session = self.session
+
+        if command == "play":
+            if session:
+                self._report_position(session)
+                self._finish_session()
+            self.session = event.session
+            self.is_playing = True
+            self.paused = False
+            chunk = self._first_chunk(self.session, 0)
+            if chunk is None:
+                self._finish_session()
+            else:
+                self._begin(self.session, chunk, time.perf_counter())
+                self.start_latency.record(time.perf_counter() - event.posted)
+            return
 
-            if completion_callback:
-                try:
-                    completion_callback()
-                except Exception as e:
-                    print(f"Error in completion callback: {e}")
+        if session is None or session.playing is None:
+            return
+
+        if command == "stop":
+            self._report_position(session)
+            self._finish_session()
+            self.stop_latency.record(time.perf_counter() - event.posted)
+
+        elif command in ("skip", "previous"):
+            self._report_position(session)
+            index = session.playing.index
+            queued = session.queued
+            if command == "skip" and queued is not None and queued.index != index:
+                # The next track is already open and read: switch straight to it
+                chunk = queued
+            elif command == "skip":
+                chunk = self._first_chunk(session, index + 1)
+            else:
+                chunk = self._first_chunk(session, max(0, index - 1), -1) or \
+                        self._first_chunk(session, index)
+            if chunk is None:
+                self._finish_session()
+                return
+            self._begin(session, chunk, time.perf_counter())
+            self.skip_latency.record(time.perf_counter() - event.posted)
+
+        elif command == "seek":
+            source = session.playing.source
+            source.seek(event.seconds * self.frequency)
+            chunk = self._read_chunk(session.playing.index, source) or \
+                    self._first_chunk(session, session.playing.index + 1)
+            if chunk is None:
+                self._report_position(session, completed=True)
+                self._finish_session()
+                return
+            self._begin(session, chunk, time.perf_counter())
+
+        elif command == "pause" and session.paused_at is None:
+            self.channel.pause()
+            session.paused_at = time.perf_counter()
+            self.paused = True
+
+        elif command == "resume" and session.paused_at is not None:
+            self.channel.unpause()
+            session.playing.started_at += time.perf_counter() - session.paused_at
+            session.paused_at = None
+            self.paused = False
+
+    def _handle_track_end(self):
+        session = self.session
+        if session is None or session.playing is None:
+            return  # left over from a stop
+
+        previous = session.playing
+        previous_end = previous.started_at + previous.frames / float(self.frequency)
+        queued = session.queued
+        if queued is not None and self.channel.get_sound() is queued.sound:
+            # SDL moved on to the queued chunk by itself, as soon as the last
+            # one ended or, if it was queued late, when it was queued
+            if queued.source is not previous.source:
+                self._report_position(session, completed=True)
+            started = max(previous_end, session.queued_at)
+            self._begin(session, queued, started, gap=started - previous_end, play=False)
+            return
 
-            print("Playback finished")
+        if self.channel.get_busy():
+            return  # left over from a skip or seek
+
+        self._report_position(session, completed=True)
+        if queued is None:
+            self._finish_session()
+        else:
+            now = time.perf_counter()
+            self._begin(session, queued, now, gap=now - previous_end)
+
+    def skip(self):
+        if self.is_playing:
+            self._post_command("skip")
+
+    def previous(self):
+        if self.is_playing:
+            self._post_command("previous")
+
+    def seek(self, seconds: float):
+        """Jump to seconds into the current track"""
+        if self.is_playing:
+            self._post_command("seek", seconds=max(0.0, seconds))
+
+    def pause(self):
+        if self.is_playing:
+            self._post_command("pause")
+
+    def resume(self):
+        if self.is_playing:
+            self._post_command("resume")
 
     def stop_playback(self):
         if not self.is_playing:
             return
 
         print("Stopping playback...")
+        session = self.session
         self.is_playing = False
-
-        try:
-            pygame.mixer.music.stop()
-        except Exception as e:
-            print(f"Error stopping playback: {e}")
-
-        if self.play_thread and self.play_thread.is_alive():
-            self.play_thread.join(timeout=2.0)
+        self._post_command("stop")
+
+        # Like the old thread join: return once the completion callback has
+        # run, unless we are that callback
+        if session and not self.dispatcher.is_current_thread() and \
+                threading.current_thread() is not self.player_thread:
+            session.finished.wait(timeout=2.0)
+
+    def is_paused(self) -> bool:
+        return self.is_playing and self.paused
+
+    def get_position(self) -> Optional[float]:
+        """Seconds into the current track, or None when nothing is playing"""
+        session = self.session
+        if not self.is_playing or session is None or session.playing is None:
+            return None
+        return self._position(session)
+
+    def get_stats(self) -> dict:
+        return {
+            'tracks_started': self.tracks_started,
+            'buffer_ms': self.buffer_seconds * 1000 if self.initialized else None,
+            'gap': self.gaps.summary(),
+            'chunk_read': self.read_times.summary(),
+            'cache': self.cache.get_stats(),
+            'stop_latency': self.stop_latency.summary(),
+            'skip_latency': self.skip_latency.summary(),
+            'start_latency': self.start_latency.summary(),
+        }
 
     def is_playing_audio(self) -> bool:
         return self.is_playing
@@ -98,54 +621,182 @@ class AudioPlayer:
     def set_volume(self, volume: float):
         try:
             # Volume should be between 0.0 and 1.0
-            volume = max(0.0, min(1.0, volume))
-            pygame.mixer.music.set_volume(volume)
+            self.volume = max(0.0, min(1.0, volume))
+            self.channel.set_volume(self.volume)
         except Exception as e:
             print(f"Error setting volume: {e}")
 
     def cleanup(self):
         self.stop_playback()
+        self.running = False
+        if self.initialized:
+            self.player_thread.join(timeout=2.0)
         try:
             pygame.mixer.quit()
         except Exception:
             pass
 
 class MockAudioPlayer:
+    """Times playback from the real file durations on one long-lived thread"""
+
     def __init__(self):
         self.is_playing = False
+        self.paused = False
         self.current_file = None
+        self.track_start = None  # when position 0 of the current track would have played
+        self.paused_at = None
+        self.commands = queue.Queue()
+        self.dispatcher = CallbackDispatcher("mock-player-callbacks")
+        self.stop_latency = LatencyHistogram("stop command to silence")
+        self.finished = None
+        self.player_thread = threading.Thread(target=self._player_loop, name="mock-player", daemon=True)
+        self.player_thread.start()
         print("Mock audio player initialized")
 
-    def play_file(self, file_path: str, completion_callback: Optional[Callable] = None) -> bool:
+    def play_file(self, file_path: str, completion_callback: Optional[Callable] = None,
+                  start_seconds: float = 0.0) -> bool:
+        return self.play_playlist([file_path], completion_callback, start_positions=[start_seconds])
+
+    def play_playlist(self, file_paths: List[str], completion_callback: Optional[Callable] = None,
+                      track_callback: Optional[Callable] = None,
+                      start_positions: Optional[List[float]] = None,
+                      position_callback: Optional[Callable] = None) -> bool:
         if self.is_playing:
             print("Mock: Already playing audio")
             return False
 
-        self.current_file = file_path
         self.is_playing = True
-        print(f"Mock: Playing {file_path}")
-
-        # Simulate playback
-        def mock_playback():
-            time.sleep(3)  # Simulate 3 seconds of playback
-            self.is_playing = False
-            self.current_file = None
-            print("Mock: Playback finished")
-
-            if completion_callback:
-                try:
-                    completion_callback()
-                except Exception as e:
-                    print(f"Mock: Error in completion callback: {e}")
-
-        threading.Thread(target=mock_playback).start()
+        self.paused = False
+        self.finished = threading.Event()
+        starts = dict(enumerate(start_positions or []))
+        self.commands.put(("play", time.perf_counter(),
+                           (list(file_paths), completion_callback, track_callback, starts,
+                            position_callback, self.finished)))
         return True
 
+    @staticmethod
+    def _track_length(file_path: str) -> float:
+        try:
+            return get_duration(file_path) or 0.0
+        except Exception:
+            return 3.0  # not a readable file; pretend it is a short message
+
+    def _player_loop(self):
+        session = None
+        index = 0
+        length = 0.0
+
+        while True:
+            timeout = None
+            if session and self.paused_at is None:
+                timeout = max(0.0, self.track_start + length - time.perf_counter())
+            try:
+                command, posted, args = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                command, posted, args = "end", None, None  # the track ran out
+
+            if command == "play":
+                session, index = args, -1
+                self.is_playing = True
+                command = "next"
+            if session is None:
+                continue
+
+            file_paths, completion_callback, track_callback, starts, position_callback, finished = session
+            now = time.perf_counter()
+            if command in ("stop", "skip", "previous", "end") and index >= 0 and position_callback:
+                position = length if command == "end" else \
+                    min(length, (self.paused_at or now) - self.track_start)
+                self.dispatcher.dispatch(position_callback, index, file_paths[index], position, length)
+
+            if command == "stop":
+                index = len(file_paths)
+                if posted is not None:
+                    self.stop_latency.record(now - posted)
+            elif command in ("skip", "next", "end"):
+                index += 1
+            elif command == "previous":
+                index = max(0, index - 1)
+            elif command == "seek":
+                self.track_start = (self.paused_at or now) - min(args, length)
+                continue
+            elif command == "pause" and self.paused_at is None:
+                self.paused_at = now
+                self.paused = True
+                print("Mock: Playback paused")
+                continue
+            elif command == "resume" and self.paused_at is not None:
+                self.track_start += now - self.paused_at
+                self.paused_at = None
+                self.paused = False
+                print("Mock: Playback resumed")
+                continue
+            else:
+                continue
+
+            self.paused_at = None
+            self.paused = False
+            if index >= len(file_paths):
+                session = None
+                # Unless play_playlist() has already been called again
+                if finished is self.finished:
+                    self.is_playing = False
+                    self.current_file = None
+                print("Mock: Playback finished")
+                self.dispatcher.dispatch(completion_callback, done=finished)
+                continue
+
+            self.current_file = file_paths[index]
+            length = self._track_length(self.current_file)
+            offset = starts.pop(index, 0.0) or 0.0
+            if offset >= length:
+                offset = 0.0
+            self.track_start = now - offset
+            print(f"Mock: Playing {self.current_file} ({length:.1f}s)" +
+                  (f" from {offset:.1f}s" if offset else ""))
+            if track_callback:
+                self.dispatcher.dispatch(track_callback, index, self.current_file)
+
+    def skip(self):
+        self.commands.put(("skip", time.perf_counter(), None))
+
+    def previous(self):
+        self.commands.put(("previous", time.perf_counter(), None))
+
+    def prefetch(self, file_path: str) -> bool:
+        return False  # nothing is decoded, so there is nothing to warm
+
+    def is_cached(self, file_path: str) -> bool:
+        return False
+
+    def add_cache_listener(self, callback: Callable[[str], None]):
+        pass
+
+    def seek(self, seconds: float):
+        self.commands.put(("seek", time.perf_counter(), max(0.0, seconds)))
+
+    def pause(self):
+        self.commands.put(("pause", time.perf_counter(), None))
+
+    def resume(self):
+        self.commands.put(("resume", time.perf_counter(), None))
+
     def stop_playback(self):
         if self.is_playing:
             print("Mock: Stopping playback...")
             self.is_playing = False
-            self.current_file = None
+            finished = self.finished
+            self.commands.put(("stop", time.perf_counter(), None))
+            if finished and not self.dispatcher.is_current_thread():
+                finished.wait(timeout=2.0)
+
+    def is_paused(self) -> bool:
+        return self.is_playing and self.paused
+
+    def get_position(self) -> Optional[float]:
+        if not self.is_playing or self.track_start is None:
+            return None
+        return max(0.0, (self.paused_at or time.perf_counter()) - self.track_start)
 
     def is_playing_audio(self) -> bool:
         return self.is_playing
@@ -156,6 +807,9 @@ class MockAudioPlayer:
     def set_volume(self, volume: float):
         print(f"Mock: Setting volume to {volume}")
 
+    def get_stats(self) -> dict:
+        return {'stop_latency': self.stop_latency.summary()}
+
     def cleanup(self):
         self.stop_playback()
 
@@ -175,4 +829,4 @@ def get_audio_player():
     except Exception as e:
         print(f"Failed to initialize audio player: {e}")
         print("Falling back to mock player")
-        return MockAudioPlayer()
\ No newline at end of file
+        return MockAudioPlayer()
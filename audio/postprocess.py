@@ -0,0 +1,172 @@
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Dict, Any, List
+from config.settings import Settings
+from audio.audio_io import read_pcm, write_pcm
+from audio.vad import detect_segments
+from storage.content_cache import pcm_hash
+
+def compute_peaks(samples: np.ndarray, buckets: int = Settings.POSTPROCESS_PEAK_BUCKETS) -> List[float]:
+    """Waveform overview: peak level (0..1) of each of `buckets` equal slices"""
+    if len(samples) == 0 or buckets <= 0:
+        return []
+
+    buckets = min(buckets, len(samples))
+    bucket_size = -(-len(samples) // buckets)
+    padded = np.zeros(bucket_size * buckets, dtype=np.int32)
+    padded[:len(samples)] = np.abs(samples.astype(np.int32))
+    peaks = padded.reshape(buckets, bucket_size).max(axis=1) / 32768.0
+    return [round(float(p), 3) for p in peaks]
+
+def loudness_gain(samples: np.ndarray, speech_mask: np.ndarray,
+                  target_dbfs: float = Settings.POSTPROCESS_TARGET_DBFS,
+                  peak_dbfs: float = Settings.POSTPROCESS_PEAK_DBFS,
+                  max_gain_db: float = Settings.POSTPROCESS_MAX_GAIN_DB) -> float:
+    # No speech found: leave noise and near-silence as they are
+    if not speech_mask.any():
+        return 1.0
+    speech = samples[speech_mask].astype(np.float32)
+
+    rms = float(np.sqrt(np.mean(speech * speech)))
+    peak = float(np.max(np.abs(samples.astype(np.float32))))
+    if rms <= 0 or peak <= 0:
+        return 1.0
+
+    # Bring speech to the target level, without clipping or boosting pure noise
+    gain = 10 ** (target_dbfs / 20.0) * 32768.0 / rms
+    gain = min(gain, 10 ** (peak_dbfs / 20.0) * 32768.0 / peak, 10 ** (max_gain_db / 20.0))
+    return gain
+
+# Bump when the analysis changes so cached results from older code are ignored
+ANALYSIS_VERSION = "2"
+
+def _analysis_variant() -> str:
+    return (f"{ANALYSIS_VERSION}:{Settings.POSTPROCESS_TRIM_PADDING}:{Settings.POSTPROCESS_TARGET_DBFS}:"
+            f"{Settings.POSTPROCESS_PEAK_DBFS}:{Settings.POSTPROCESS_MAX_GAIN_DB}:{Settings.POSTPROCESS_PEAK_BUCKETS}")
+
+def analyze_recording(samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+    """Decide the trim and gain for a recording without touching it"""
+    segments = detect_segments(samples, sample_rate)
+
+    if segments:
+        pad = int(Settings.POSTPROCESS_TRIM_PADDING * sample_rate)
+        start = max(0, segments[0][0] - pad)
+        end = min(len(samples), segments[-1][1] + pad)
+    else:
+        # Nothing recognizably speech; leave the length alone
+        start, end = 0, len(samples)
+
+    trimmed = samples[start:end]
+    speech_mask = np.zeros(len(trimmed), dtype=bool)
+    for seg_start, seg_end in segments:
+        speech_mask[max(0, seg_start - start):max(0, seg_end - start)] = True
+
+    return {
+        'start': start,
+        'end': end,
+        'gain': float(loudness_gain(trimmed, speech_mask)),
+        'speech_segments': [(max(0, s - start), min(end, e) - start) for s, e in segments],
+    }
+
+def process_recording(file_path: str, cache=None) -> Dict[str, Any]:
+    """Trim leading/trailing silence and normalize loudness in place.
+
+    With a content cache, audio that was analyzed before is not analyzed
+    again, and a recording that has already been processed is left alone.
+    """
+    samples, sample_rate = read_pcm(file_path)
+    original_duration = len(samples) / float(sample_rate)
+
+    analysis = None
+    if cache:
+        content_hash = pcm_hash(samples, sample_rate)
+        analysis = cache.get("analysis", content_hash, _analysis_variant())
+
+    if analysis is None:
+        analysis = analyze_recording(samples, sample_rate)
+        analysis['peaks'] = None
+    start, end, gain = analysis['start'], analysis['end'], analysis['gain']
+
+    trimmed = samples[start:end]
+    if abs(gain - 1.0) > 0.01:
+        output = np.clip(np.rint(trimmed.astype(np.float32) * gain), -32768, 32767).astype(np.int16)
+    else:
+        output = trimmed
+
+    changed = start > 0 or end < len(samples) or output is not trimmed
+    if changed:
+        write_pcm(file_path, output, sample_rate)
+
+    peaks = analysis['peaks'] or compute_peaks(output)
+    speech_segments = [tuple(segment) for segment in analysis['speech_segments']]
+
+    if cache and analysis['peaks'] is None:
+        analysis['peaks'] = peaks
+        cache.put("analysis", content_hash, _analysis_variant(), analysis)
+        if changed:
+            # The processed file needs nothing more if it is ever seen again
+            cache.put("analysis", pcm_hash(output, sample_rate), _analysis_variant(), {
+                'start': 0,
+                'end': len(output),
+                'gain': 1.0,
+                'speech_segments': speech_segments,
+                'peaks': peaks,
+            })
+
+    return {
+        'file_path': file_path,
+        'sample_rate': sample_rate,
+        'original_duration': original_duration,
+        'duration': len(output) / float(sample_rate),
+        'trim_start': start / float(sample_rate),
+        'trim_end': (len(samples) - end) / float(sample_rate),
+        'gain_db': float(20 * np.log10(gain)),
+        'speech_segments': speech_segments,
+        'peaks': peaks,
+    }
+
+class RecordingPostProcessor:
+    """Runs process_recording for finished recordings on a bounded worker pool"""
+
+    def __init__(self, max_workers: int = Settings.POSTPROCESS_WORKERS,
+                 max_pending: int = Settings.POSTPROCESS_MAX_PENDING, cache=None):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="postprocess")
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, file_path: str, callback: Optional[Callable] = None) -> bool:
+        if not self.slots.acquire(blocking=False):
+            print(f"Post-processing queue full, skipping {file_path}")
+            return False
+
+        try:
+            self.executor.submit(self._run_job, file_path, callback)
+            return True
+        except RuntimeError as e:
+            self.slots.release()
+            print(f"Post-processor is shut down: {e}")
+            return False
+
+    def _run_job(self, file_path: str, callback: Optional[Callable]):
+        result = None
+        try:
+            started = time.perf_counter()
+            result = process_recording(file_path, self.cache)
+            print(f"Post-processed {file_path}: {result['original_duration']:.1f}s -> "
+                  f"{result['duration']:.1f}s, gain {result['gain_db']:+.1f} dB "
+                  f"({time.perf_counter() - started:.2f}s)")
+        except Exception as e:
+            print(f"Error post-processing {file_path}: {e}")
+        finally:
+            self.slots.release()
+
+        if callback:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Error in post-processing callback: {e}")
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
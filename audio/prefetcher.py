@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from config.settings import Settings
+from audio.metrics import LatencyHistogram
+
+def lower_thread_priority():
+    """Run the calling thread only when nothing else wants the CPU.
+    On Linux both calls apply to the thread, not the whole process."""
+    try:
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        return
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError) as e:
+        print(f"Could not lower prefetch priority: {e}")
+
+class Prefetcher:
+    """Warms the player's decode cache with the messages most likely to be asked for next.
+
+    Once Muninn has sat in SLEEPING for PREFETCH_DELAY_SECONDS, family
+    members are scored from the play history, where recent plays count more
+    and plays around this hour of the day count PREFETCH_HOUR_WEIGHT times,
+    plus a bonus for each new message nobody has heard yet. The newest
+    message of each of the top PREFETCH_MEMBERS, and the newest message
+    overall, are then decoded on an idle-priority thread. Work stops as soon
+    as Muninn wakes. record_request() counts whether what was asked for had
+    been warmed and was still in the cache, so the hit rate shows whether
+    this pays off.
+    """
+
+    def __init__(self, database, player, is_idle: Callable[[], bool]):
+        self.database = database
+        self.player = player
+        self.is_idle = is_idle
+        self.wakeup = threading.Condition()
+        self.idle_since: Optional[float] = None
+        self.running = False
+        self.thread = None
+
+        self.lock = threading.Lock()
+        self.warmed = set()
+        self.passes = 0
+        self.hits = 0
+        self.misses = 0
+        self.warm_times = LatencyHistogram("prefetch warm")
+        player.add_cache_listener(self._on_evicted)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        if not self.running:
+            return
+        self.running = False
+        with self.wakeup:
+            self.wakeup.notify_all()
+        self.thread.join(timeout)
+
+    def on_idle(self):
+        """Call on entering SLEEPING"""
+        with self.wakeup:
+            self.idle_since = time.time()
+            self.wakeup.notify()
+
+    def _run(self):
+        lower_thread_priority()
+        while True:
+            with self.wakeup:
+                while self.running and self.idle_since is None:
+                    self.wakeup.wait()
+                if not self.running:
+                    return
+                wait = self.idle_since + Settings.PREFETCH_DELAY_SECONDS - time.time()
+                if wait > 0:
+                    # Re-check afterwards: Muninn may have woken and slept again
+                    self.wakeup.wait(wait)
+                    continue
+                self.idle_since = None
+
+            if self.is_idle():
+                self.prefetch_pass()
+
+    def prefetch_pass(self):
+        try:
+            targets = self.predict()
+        except Exception as e:
+            print(f"Error predicting messages to prefetch: {e}")
+            return
+
+        self.passes += 1
+        for file_path in targets:
+            if not self.running or not self.is_idle():
+                break
+            started = time.perf_counter()
+            try:
+                if self.player.prefetch(file_path):
+                    with self.lock:
+                        self.warmed.add(file_path)
+                    self.warm_times.record(time.perf_counter() - started)
+            except Exception as e:
+                print(f"Error prefetching {file_path}: {e}")
+
+    def predict(self, now: Optional[float] = None) -> List[str]:
+        """File paths most likely to be requested next, most likely first"""
+        now = now or time.time()
+        hour = time.localtime(now).tm_hour
+        scores: Dict[str, float] = {}
+        heard = set()
+
+        for play in self.database.get_play_history(now - Settings.PREFETCH_HISTORY_DAYS * 86400):
+            heard.add(play['message_id'])
+            age_days = max(0.0, now - play['played_at']) / 86400.0
+            weight = 0.5 ** (age_days / Settings.PREFETCH_HALF_LIFE_DAYS)
+            hours_apart = abs(time.localtime(play['played_at']).tm_hour - hour)
+            if min(hours_apart, 24 - hours_apart) <= 1:
+                weight *= Settings.PREFETCH_HOUR_WEIGHT
+            member = play['family_member']
+            scores[member] = scores.get(member, 0.0) + weight
+
+        new_messages = self.database.get_recent_messages(days=Settings.PREFETCH_NEW_MESSAGE_DAYS)
+        for message in new_messages:
+            if message['id'] not in heard:
+                member = message['family_member']
+                scores[member] = scores.get(member, 0.0) + Settings.PREFETCH_NEW_MESSAGE_WEIGHT
+
+        # "Play recent" starts with the newest message of all
+        targets = [new_messages[0]['file_path']] if new_messages else []
+        ranked = sorted(scores, key=lambda member: -scores[member])
+        for member in ranked[:Settings.PREFETCH_MEMBERS]:
+            for message in self.database.get_messages_by_family_member(member, limit=1):
+                targets.append(message['file_path'])
+
+        paths = []
+        for file_path in targets:
+            if file_path not in paths and os.path.exists(file_path):
+                paths.append(file_path)
+        return paths
+
+    def _on_evicted(self, file_path: str):
+        with self.lock:
+            self.warmed.discard(file_path)
+
+    def record_request(self, file_path: str):
+        """Call with the first file of each playback a listener asks for"""
+        # Checked before taking our lock; the cache calls _on_evicted with its own released
+        cached = self.player.is_cached(file_path)
+        with self.lock:
+            if file_path in self.warmed and cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.warmed.discard(file_path)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'passes': self.passes,
+                'warmed': len(self.warmed),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'warm': self.warm_times.summary(),
+            }
@@ -1,38 +1,48 @@
-import pyaudio
-import wave
+import os
 import threading
 import time
-import numpy as np
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Dict, Any
 from config.settings import Settings
+from audio.capture_bus import AudioCaptureBus, CaptureSubscription
+from audio.vad import VoiceActivityDetector, Segment
+from audio.encoder import EncoderStage
 
 class AudioRecorder:
-    def __init__(self):
-        self.audio = pyaudio.PyAudio()
+    def __init__(self, capture_bus: Optional[AudioCaptureBus] = None):
+        # Without a shared bus the recorder opens the microphone only while recording
+        self.capture_bus = capture_bus or AudioCaptureBus()
+        self.owns_capture_bus = capture_bus is None
+        self.subscription: Optional[CaptureSubscription] = None
         self.recording = False
-        self.frames = []
-        self.stream = None
+        self.writer: Optional[EncoderStage] = None
         self.record_thread = None
         self.vad_callback: Optional[Callable] = None
-        self.silence_start_time = None
+        self.vad = VoiceActivityDetector()
+        self.stopped_by_vad = False
+        self.overflows_at_start = 0
 
-    def start_recording(self, filename: str, vad_callback: Optional[Callable] = None):
+    def start_recording(self, filename: str, vad_callback: Optional[Callable] = None,
+                        start_position: Optional[int] = None):
         if self.recording:
             print("Already recording!")
             return False
 
-        self.frames = []
         self.recording = True
         self.vad_callback = vad_callback
-        self.silence_start_time = None
+        self.vad.reset()
+        self.stopped_by_vad = False
 
         try:
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=Settings.CHANNELS,
-                rate=Settings.SAMPLE_RATE,
-                input=True,
-                frames_per_buffer=Settings.CHUNK_SIZE
+            if not self.capture_bus.is_running() and not self.capture_bus.start():
+                raise RuntimeError("audio capture is not running")
+
+            self.writer = EncoderStage(filename)
+            self.overflows_at_start = self.capture_bus.input_overflows
+
+            self.subscription = self.capture_bus.subscribe(
+                Settings.CHUNK_SIZE,
+                preroll_seconds=Settings.RECORDING_PREROLL_SECONDS,
+                start_position=start_position
             )
 
             self.record_thread = threading.Thread(target=self._record_audio, args=(filename,))
@@ -44,6 +54,9 @@ class AudioRecorder:
         except Exception as e:
             print(f"Error starting recording: {e}")
             self.recording = False
+            if self.writer:
+                self.writer.close()
+                self.writer = None
             return False
 
     def stop_recording(self):
@@ -56,54 +69,67 @@ class AudioRecorder:
         if self.record_thread and self.record_thread.is_alive():
             self.record_thread.join()
 
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-
     def _record_audio(self, filename: str):
         print("Recording thread started")
 
         while self.recording:
             try:
-                data = self.stream.read(Settings.CHUNK_SIZE, exception_on_overflow=False)
-                self.frames.append(data)
-
-                # Voice Activity Detection
-                if self.vad_callback and Settings.VAD_SILENCE_DURATION > 0:
-                    audio_data = np.frombuffer(data, dtype=np.int16)
-                    energy = np.sqrt(np.mean(audio_data**2))
-
-                    if energy < Settings.VAD_ENERGY_THRESHOLD:
-                        if self.silence_start_time is None:
-                            self.silence_start_time = time.time()
-                        elif time.time() - self.silence_start_time > Settings.VAD_SILENCE_DURATION:
-                            print("Silence detected, stopping recording")
-                            self.recording = False
-                            break
-                    else:
-                        self.silence_start_time = None
+                chunk = self.subscription.read(timeout=1.0)
+                if chunk is None:
+                    if not self.capture_bus.is_running():
+                        print("Audio capture stopped during recording")
+                        break
+                    continue
+
+                self.writer.write(chunk.tobytes())
+
+                # Voice Activity Detection, counted in samples rather than wall time
+                self.vad.process(chunk)
+                if (self.vad_callback and Settings.VAD_SILENCE_DURATION > 0 and
+                        self.vad.silence_seconds > Settings.VAD_SILENCE_DURATION):
+                    print("Silence detected, stopping recording")
+                    self.stopped_by_vad = True
+                    break
 
             except Exception as e:
                 print(f"Error during recording: {e}")
                 break
 
-        self._save_recording(filename)
+        self.recording = False
+        dropped = self.capture_bus.input_overflows - self.overflows_at_start
+        if dropped or self.subscription.overruns:
+            print(f"Warning: capture fell behind during recording "
+                  f"({dropped} input overflows, {self.subscription.overruns} ring overruns)")
+        self.subscription.close()
+        self.subscription = None
+        if self.owns_capture_bus:
+            self.capture_bus.stop()
+
+        self._finish_recording(filename)
         print("Recording thread finished")
 
-    def _save_recording(self, filename: str):
-        if not self.frames:
-            print("No audio data to save")
+        if self.stopped_by_vad and self.vad_callback:
+            try:
+                self.vad_callback()
+            except Exception as e:
+                print(f"Error in VAD callback: {e}")
+
+    def _finish_recording(self, filename: str):
+        writer = self.writer
+        self.writer = None
+        if writer is None:
             return
 
         try:
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(Settings.CHANNELS)
-                wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                wf.setframerate(Settings.SAMPLE_RATE)
-                wf.writeframes(b''.join(self.frames))
+            writer.close()
+
+            if writer.data_bytes == 0:
+                print("No audio data to save")
+                os.remove(filename)
+                return
 
-            print(f"Audio saved to {filename}")
+            print(f"Audio saved to {filename} ({writer.duration:.1f}s {writer.audio_format}, "
+                  f"encoder CPU {writer.cpu_seconds:.2f}s)")
 
         except Exception as e:
             print(f"Error saving recording: {e}")
@@ -111,15 +137,27 @@ class AudioRecorder:
     def is_recording(self) -> bool:
         return self.recording
 
+    def get_speech_segments(self) -> List[Segment]:
+        # Sample offsets of speech in the last recording, including any pre-roll
+        return self.vad.segments
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        stats = self.capture_bus.get_stats()
+        if self.writer:
+            stats['encoder_queue_max'] = self.writer.max_queue_depth
+        return stats
+
     def cleanup(self):
         self.stop_recording()
-        self.audio.terminate()
+        if self.owns_capture_bus:
+            self.capture_bus.stop()
 
 class MockAudioRecorder:
     def __init__(self):
         self.recording = False
 
-    def start_recording(self, filename: str, vad_callback: Optional[Callable] = None):
+    def start_recording(self, filename: str, vad_callback: Optional[Callable] = None,
+                        start_position: Optional[int] = None):
         if self.recording:
             print("Mock: Already recording!")
             return False
@@ -139,6 +177,9 @@ class MockAudioRecorder:
             except Exception as e:
                 print(f"Mock: Error saving file: {e}")
 
+            if vad_callback:
+                vad_callback()
+
         threading.Thread(target=mock_recording).start()
         return True
 
@@ -150,16 +191,22 @@ class MockAudioRecorder:
     def is_recording(self) -> bool:
         return self.recording
 
+    def get_speech_segments(self) -> List[Segment]:
+        return []
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        return {'mode': "mock"}
+
     def cleanup(self):
         self.stop_recording()
 
-def get_audio_recorder():
+def get_audio_recorder(capture_bus: Optional[AudioCaptureBus] = None):
     if Settings.MOCK_MODE:
         print("Using mock audio recorder (development mode)")
         return MockAudioRecorder()
 
     try:
-        recorder = AudioRecorder()
+        recorder = AudioRecorder(capture_bus)
         print("Using real audio recorder")
         return recorder
     except Exception as e:
@@ -1,84 +1,178 @@
-import speech_recognition as sr
-from typing import Optional, Tuple
-from config.family_names import FAMILY_MEMBERS
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Dict, Any, List
+from config.settings import Settings
+from audio.audio_io import read_pcm, get_duration
+from audio.command_grammar import CommandMatch, CommandMatcher
+from audio.stt_backends import TranscriptionBackend, TranscriptionError, get_stt_backend
+from audio.vad import detect_segments, split_at_silence
+from storage.content_cache import pcm_hash
+
+def join_segment_text(segments: List[Dict[str, Any]]) -> Optional[str]:
+    text = " ".join(segment['text'] for segment in segments if segment['text'])
+    return text or None
 
 class SpeechToTextProcessor:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
+    def __init__(self, backend: Optional[TranscriptionBackend] = None,
+                 segment_workers: int = Settings.STT_SEGMENT_WORKERS, cache=None):
+        self.backend = backend or get_stt_backend()
+        self.cache = cache
+        # Shared by every caller, so concurrent jobs cannot oversubscribe the CPU or the service
+        self.segment_pool = ThreadPoolExecutor(max_workers=segment_workers, thread_name_prefix="stt-segment")
+        self.command_matcher = CommandMatcher()
+
+    def transcribe_audio_file(self, file_path: str, raise_errors: bool = False) -> Optional[str]:
+        segments = self.transcribe_segments(file_path, raise_errors)
+        if segments is None:
+            return None
+
+        text = join_segment_text(segments)
+        if text is None:
+            print("Could not understand audio")
+        return text
 
-    def transcribe_audio_file(self, file_path: str) -> Optional[str]:
+    def transcribe_segments(self, file_path: str, raise_errors: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Transcribe a recording piece by piece.
+
+        Returns one dict per piece (index, start, end in seconds, text), or
+        None if the transcription failed. raise_errors lets queued callers
+        retry service and I/O failures; audio with no recognizable speech
+        gives pieces with text None either way.
+        """
         try:
-            with sr.AudioFile(file_path) as source:
-                audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio)
-                return text.strip()
+            samples, sample_rate = read_pcm(file_path)
+        except Exception as e:
+            print(f"Error reading audio for transcription: {e}")
+            if raise_errors:
+                raise
+            return None
 
-        except sr.UnknownValueError:
-            print("Could not understand audio")
+        return self.transcribe_samples(samples, sample_rate, raise_errors)
+
+    def transcribe_samples(self, samples: np.ndarray, sample_rate: int,
+                           raise_errors: bool = False) -> Optional[List[Dict[str, Any]]]:
+        if self.cache:
+            content_hash = pcm_hash(samples, sample_rate)
+            variant = f"{self.backend.name}:{self.backend.version}:{Settings.STT_SEGMENT_MAX_SECONDS}"
+            cached = self.cache.get("transcription", content_hash, variant)
+            if cached is not None:
+                print("Transcription found in cache")
+                return cached
+
+        max_samples = int(Settings.STT_SEGMENT_MAX_SECONDS * sample_rate)
+        speech = detect_segments(samples, sample_rate) if len(samples) > max_samples else []
+        bounds = split_at_silence(speech, len(samples), max_samples)
+
+        def transcribe_piece(start: int, end: int) -> Optional[str]:
+            return self.backend.transcribe(samples[start:end].tobytes(), sample_rate)
+
+        futures = []
+        try:
+            if len(bounds) == 1:
+                # A short recording is one piece; no need to hop to the pool
+                texts = [transcribe_piece(*bounds[0])]
+            else:
+                for start, end in bounds:
+                    if speech and not any(s < end and e > start for s, e in speech):
+                        futures.append(None)  # nothing but silence in this piece
+                    else:
+                        futures.append(self.segment_pool.submit(transcribe_piece, start, end))
+                texts = [future.result() if future else None for future in futures]
+        except Exception as e:
+            for future in futures:
+                if future:
+                    future.cancel()
+            if isinstance(e, TranscriptionError):
+                print(f"Error with speech recognition service: {e}")
+            else:
+                print(f"Error transcribing audio: {e}")
+            if raise_errors:
+                raise
             return None
-        except sr.RequestError as e:
+
+        segments = [{
+            'index': index,
+            'start': start / float(sample_rate),
+            'end': end / float(sample_rate),
+            'text': text,
+        } for index, ((start, end), text) in enumerate(zip(bounds, texts))]
+
+        if len(segments) > 1:
+            print(f"Transcribed {len(segments)} pieces of {len(samples) / float(sample_rate):.1f}s recording")
+        if self.cache:
+            self.cache.put("transcription", content_hash, variant, segments)
+        return segments
+
+    def transcribe_audio_data(self, pcm: bytes, sample_rate: int,
+                              raise_errors: bool = False) -> Optional[str]:
+        try:
+            text = self.backend.transcribe(pcm, sample_rate)
+            if text is None:
+                print("Could not understand audio")
+            return text
+
+        except TranscriptionError as e:
             print(f"Error with speech recognition service: {e}")
+            if raise_errors:
+                raise
             return None
         except Exception as e:
             print(f"Error transcribing audio: {e}")
+            if raise_errors:
+                raise
             return None
 
-    def process_command(self, audio_text: str) -> Tuple[str, Optional[str]]:
-        text = audio_text.lower().strip()
+    def shutdown(self):
+        self.segment_pool.shutdown(wait=False, cancel_futures=True)
 
-        # Remove wake word if present (handle both "muninn" and "munin")
-        if text.startswith("muninn"):
-            text = text[6:].strip()
-        elif text.startswith("munin"):
-            text = text[5:].strip()
+    def get_backend_stats(self) -> Dict[str, Any]:
+        return self.backend.get_stats()
 
-        if text.startswith(","):
-            text = text[1:].strip()
+    def parse_command(self, audio_text: str) -> CommandMatch:
+        return self.command_matcher.match(audio_text)
 
-        # Check for recording command
-        if any(phrase in text for phrase in ["remember this", "record this", "save this", "remember"]):
-            return "record", None
-
-        # Check for playback commands - improved to handle possessive and descriptive phrases
-        if any(phrase in text for phrase in ["play", "hear", "listen to"]):
-            # Extract family member name - handle possessive forms and descriptive text
-            for member in FAMILY_MEMBERS:
-                member_lower = member.lower()
-                # Check for exact name, possessive form (carrie's), or in context
-                if (member_lower in text or
-                    f"{member_lower}'s" in text or
-                    f"{member_lower}s" in text):
-                    return "play", member.upper()
-
-            # If no specific member found, return general play command
-            return "play", None
-
-        # Check for stop command
-        if any(phrase in text for phrase in ["stop", "enough", "cancel", "quit"]):
-            return "stop", None
+    def process_command(self, audio_text: str) -> Tuple[str, Optional[str]]:
+        match = self.parse_command(audio_text)
 
-        # Check for list commands
-        if any(phrase in text for phrase in ["list", "show", "what do you have"]):
-            return "list", None
+        if match.intent == "unknown":
+            return "unknown", match.text
 
-        # Check for help commands
-        if any(phrase in text for phrase in ["help", "what can you do", "commands"]):
-            return "help", None
+        if match.intent in ("record", "play"):
+            if match.member is None and match.candidates:
+                guesses = ", ".join(f"{member} ({confidence:.2f})" for member, confidence in match.candidates[:3])
+                print(f"Not sure which family member was meant: {guesses}")
+            return match.intent, match.member
 
-        # Default: unrecognized command
-        return "unknown", text
+        return match.intent, None
 
 class MockSpeechToTextProcessor:
     def __init__(self):
         print("Mock Speech-to-Text processor initialized")
 
-    def transcribe_audio_file(self, file_path: str) -> Optional[str]:
+    def transcribe_audio_file(self, file_path: str, raise_errors: bool = False) -> Optional[str]:
         print(f"Mock: Transcribing {file_path}")
         # Return a mock transcription
         return "This is a mock transcription of the audio file."
 
+    def transcribe_segments(self, file_path: str, raise_errors: bool = False) -> Optional[List[Dict[str, Any]]]:
+        text = self.transcribe_audio_file(file_path, raise_errors)
+        try:
+            duration = get_duration(file_path)
+        except Exception:
+            duration = 0.0
+        return [{'index': 0, 'start': 0.0, 'end': duration, 'text': text}]
+
+    def transcribe_audio_data(self, pcm: bytes, sample_rate: int,
+                              raise_errors: bool = False) -> Optional[str]:
+        print(f"Mock: Transcribing {len(pcm) // 2 / sample_rate:.1f}s of command audio")
+        return "munin play carrie's messages"
+
+    def get_backend_stats(self) -> Dict[str, Any]:
+        return {'backend': "mock"}
+
+    def shutdown(self):
+        pass
+
     def process_command(self, audio_text: str) -> Tuple[str, Optional[str]]:
         # For testing, provide some mock command processing
         text = audio_text.lower()
@@ -92,13 +186,13 @@ class MockSpeechToTextProcessor:
         else:
             return "unknown", text
 
-def get_speech_processor():
+def get_speech_processor(cache=None):
     if Settings.MOCK_MODE:
         print("Using mock speech processor (development mode)")
         return MockSpeechToTextProcessor()
 
     try:
-        processor = SpeechToTextProcessor()
+        processor = SpeechToTextProcessor(cache=cache)
         print("Using real speech recognition")
         return processor
     except Exception as e:
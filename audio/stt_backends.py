@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Optional, Dict, Any
+from config.settings import Settings
+from audio.vad import detect_segments
+
+class TranscriptionError(Exception):
+    """The backend failed for a reason worth retrying (network, service, I/O)"""
+
+class TranscriptionBackend:
+    """Turns 16-bit mono PCM into text and keeps track of its real-time factor.
+
+    Subclasses implement _transcribe(), returning None when the audio holds
+    no recognizable speech and raising TranscriptionError for retryable
+    failures.
+    """
+
+    name = "base"
+    version = "1"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        started = time.perf_counter()
+        try:
+            return self._transcribe(pcm, sample_rate)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.calls += 1
+                self.audio_seconds += len(pcm) / 2.0 / sample_rate
+                self.processing_seconds += elapsed
+
+    def _transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        raise NotImplementedError
+
+    @property
+    def real_time_factor(self) -> float:
+        # Seconds of processing per second of audio; below 1.0 keeps up with speech
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'version': self.version,
+            'calls': self.calls,
+            'audio_seconds': self.audio_seconds,
+            'processing_seconds': self.processing_seconds,
+            'real_time_factor': self.real_time_factor,
+        }
+
+class GoogleBackend(TranscriptionBackend):
+    name = "google"
+    version = "web-speech-v2"
+
+    def __init__(self):
+        super().__init__()
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def _transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        audio = self.sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio).strip()
+        except self.sr.UnknownValueError:
+            return None
+        except self.sr.RequestError as e:
+            raise TranscriptionError(f"speech recognition service: {e}")
+
+class VoskBackend(TranscriptionBackend):
+    """Offline Kaldi recognizer; needs the vosk package and a model directory"""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str = Settings.VOSK_MODEL_PATH):
+        super().__init__()
+        import vosk
+
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
+
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+        self.version = f"{getattr(vosk, '__version__', 'unknown')}-{os.path.basename(model_path.rstrip(os.sep))}"
+
+    def _transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        recognizer = self.vosk.KaldiRecognizer(self.model, sample_rate)
+        step = sample_rate * 2  # feed a second at a time
+        for offset in range(0, len(pcm), step):
+            recognizer.AcceptWaveform(pcm[offset:offset + step])
+        text = json.loads(recognizer.FinalResult()).get('text', '').strip()
+        return text or None
+
+class StandInBackend(TranscriptionBackend):
+    """Deterministic local engine for tests and benchmarks.
+
+    Describes the speech it finds instead of recognizing words, so the same
+    audio always gives the same text without any model or network.
+    """
+
+    name = "standin"
+    version = "1"
+
+    def _transcribe(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        segments = detect_segments(samples, sample_rate)
+        if not segments:
+            return None
+        speech = sum(end - start for start, end in segments) / float(sample_rate)
+        return f"{len(segments)} phrases, {speech:.1f} seconds of speech"
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "standin": StandInBackend,
+}
+
+def get_stt_backend(name: str = Settings.STT_BACKEND) -> TranscriptionBackend:
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        print(f"Unknown speech-to-text backend '{name}', using google")
+        backend_class = GoogleBackend
+
+    try:
+        backend = backend_class()
+        print(f"Speech-to-text backend: {backend.name} ({backend.version})")
+        return backend
+    except Exception as e:
+        if backend_class is GoogleBackend:
+            raise
+        print(f"Failed to initialize {name} backend: {e}")
+        print("Falling back to google backend")
+        return GoogleBackend()
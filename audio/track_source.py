@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+import numpy as np
+from typing import Callable, Tuple
+from audio.audio_io import SOUNDFILE_AVAILABLE, is_wav, resample
+
+if SOUNDFILE_AVAILABLE:
+    import soundfile
+
+class TrackSource:
+    """One track's audio, read in mixer-ready chunks from any position.
+
+    Subclasses provide the file's own samples through _read_native(); this
+    class converts them to the mixer's rate and channel count and keeps the
+    read position, counted in mixer frames.
+
+    After collect(), a track read straight through from the start is handed
+    whole to on_complete(pcm) at the end, so a caller can keep the decoded
+    track without decoding it twice.
+    """
+
+    def __init__(self, file_path: str, native_rate: int, native_frames: int,
+                 frequency: int, channels: int):
+        self.file_path = file_path
+        self.native_rate = native_rate
+        self.native_frames = native_frames
+        self.frequency = frequency
+        self.channels = channels
+        self.frames = int(round(native_frames * frequency / float(native_rate)))
+        self.position = 0
+        self.on_complete = None
+        self._collected = None
+
+    @property
+    def duration(self) -> float:
+        return self.frames / float(self.frequency)
+
+    def collect(self, on_complete: Callable):
+        if self.position == 0:
+            self.on_complete = on_complete
+            self._collected = []
+
+    def seek(self, frame: int):
+        self.position = max(0, min(self.frames, int(frame)))
+        if self.position != 0:
+            self._collected = None  # no longer a straight read
+
+    def read(self, frames: int) -> bytes:
+        start = self.position
+        end = min(self.frames, start + frames)
+        if end <= start:
+            return b""
+
+        native_start = int(start * self.native_rate / float(self.frequency))
+        native_end = int(end * self.native_rate / float(self.frequency))
+        samples = self._read_native(native_start, native_end - native_start)
+        samples = resample(samples, self.native_rate, self.frequency)
+        if self.channels > 1:
+            samples = np.repeat(samples, self.channels)
+        pcm = samples.tobytes()
+        self.position = end
+
+        if self._collected is not None:
+            self._collected.append(pcm)
+            if end >= self.frames:
+                self.on_complete(b"".join(self._collected))
+                self._collected = None
+        return pcm
+
+    def _read_native(self, start: int, count: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def close(self):
+        self._collected = None
+
+class MemoryTrackSource(TrackSource):
+    """Already decoded, mixer-ready PCM"""
+
+    def __init__(self, file_path: str, pcm: bytes, frequency: int, channels: int):
+        self.pcm = pcm
+        super().__init__(file_path, frequency, len(pcm) // (2 * channels), frequency, channels)
+
+    def read(self, frames: int) -> bytes:
+        start = self.position
+        end = min(self.frames, start + frames)
+        self.position = max(start, end)
+        frame_bytes = 2 * self.channels
+        return self.pcm[start * frame_bytes:end * frame_bytes]
+
+def _wav_layout(data: mmap.mmap) -> Tuple[int, int, int, int, int]:
+    """(data offset, data length, channels, sample rate, sample width) of a WAV"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        size = struct.unpack("<I", data[offset + 4:offset + 8])[0]
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", data[offset + 8:offset + 24])
+            fmt = (channels, sample_rate, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            # A header never patched after a crash says 0; use what is there
+            length = min(size, len(data) - offset - 8) if size else len(data) - offset - 8
+            return (offset + 8, length) + fmt
+        offset += 8 + size + (size & 1)
+    raise ValueError("no data chunk")
+
+class WavTrackSource(TrackSource):
+    """Reads 16-bit WAV through a memory map, touching only the pages played"""
+
+    def __init__(self, file_path: str, frequency: int, channels: int):
+        with open(file_path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offset, length, self.file_channels, sample_rate, width = _wav_layout(self.map)
+            if width != 2:
+                raise ValueError(f"unsupported sample width {width * 8} bits")
+            frame_count = length // (2 * self.file_channels)
+            self.samples = np.frombuffer(self.map, dtype=np.int16, offset=offset,
+                                         count=frame_count * self.file_channels)
+        except Exception:
+            self.map.close()
+            raise
+        super().__init__(file_path, sample_rate, frame_count, frequency, channels)
+
+    def _read_native(self, start: int, count: int) -> np.ndarray:
+        samples = self.samples[start * self.file_channels:(start + count) * self.file_channels]
+        if self.file_channels > 1:
+            return samples.reshape(-1, self.file_channels).mean(axis=1).astype(np.int16)
+        return np.array(samples)  # copy out so the map can be closed
+
+    def close(self):
+        super().close()
+        self.samples = None
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # a chunk view is still alive; the map closes when it goes
+
+class SoundFileTrackSource(TrackSource):
+    """FLAC/Opus and anything else libsndfile decodes, with seeking"""
+
+    def __init__(self, file_path: str, frequency: int, channels: int):
+        self.file = soundfile.SoundFile(file_path)
+        super().__init__(file_path, self.file.samplerate, self.file.frames, frequency, channels)
+
+    def _read_native(self, start: int, count: int) -> np.ndarray:
+        if self.file.tell() != start:
+            self.file.seek(start)
+        samples = self.file.read(count, dtype='int16', always_2d=True)
+        if samples.shape[1] > 1:
+            return samples.mean(axis=1).astype(np.int16)
+        return samples[:, 0].copy()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+def open_track_source(file_path: str, frequency: int, channels: int) -> TrackSource:
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    if is_wav(file_path):
+        try:
+            return WavTrackSource(file_path, frequency, channels)
+        except ValueError:
+            if not SOUNDFILE_AVAILABLE:
+                raise
+    if SOUNDFILE_AVAILABLE:
+        return SoundFileTrackSource(file_path, frequency, channels)
+    raise RuntimeError(f"soundfile is required to play {os.path.splitext(file_path)[1]} files")
@@ -0,0 +1,146 @@
+import calendar
+import threading
+import time
+from typing import Dict, Any
+from config.settings import Settings
+from audio.metrics import LatencyHistogram
+from audio.speech_to_text import join_segment_text
+
+PRIORITY_FRESH = 10
+PRIORITY_BACKLOG = 0
+
+class TranscriptionQueue:
+    """Transcribes recordings on worker threads from a queue kept in SQLite.
+
+    Jobs live in the transcription_jobs table, so anything queued or in
+    flight when the device loses power is picked up again on the next start.
+    Fresh recordings jump ahead of the backlog, and failed jobs are retried
+    with exponential backoff up to TRANSCRIPTION_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, database, speech_processor, workers: int = Settings.TRANSCRIPTION_WORKERS):
+        self.database = database
+        self.speech_processor = speech_processor
+        self.worker_count = workers
+        self.workers = []
+        self.running = False
+        self.wakeup = threading.Condition()
+
+        self.job_times = LatencyHistogram("transcription job")
+        self.queue_wait = LatencyHistogram("transcription queue wait")
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self):
+        if self.running:
+            return
+
+        recovered = self.database.reset_running_transcription_jobs()
+        if recovered:
+            print(f"Requeued {recovered} interrupted transcription jobs")
+
+        self.running = True
+        for index in range(self.worker_count):
+            worker = threading.Thread(target=self._worker_loop, name=f"transcribe-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        print(f"Transcription queue started with {self.worker_count} workers")
+
+    def stop(self, timeout: float = 5.0):
+        if not self.running:
+            return
+
+        self.running = False
+        with self.wakeup:
+            self.wakeup.notify_all()
+        for worker in self.workers:
+            worker.join(timeout)
+        self.workers = []
+
+    def enqueue(self, message_id: int, file_path: str, fresh: bool = True):
+        priority = PRIORITY_FRESH if fresh else PRIORITY_BACKLOG
+        self.database.enqueue_transcription_job(message_id, file_path, priority)
+        with self.wakeup:
+            self.wakeup.notify()
+
+    def enqueue_backlog(self) -> int:
+        messages = self.database.get_untranscribed_messages()
+        for message in messages:
+            self.database.enqueue_transcription_job(message['id'], message['file_path'], PRIORITY_BACKLOG)
+        if messages:
+            print(f"Queued {len(messages)} older recordings for transcription")
+            with self.wakeup:
+                self.wakeup.notify_all()
+        return len(messages)
+
+    def _wait_for_work(self):
+        next_attempt = self.database.get_next_transcription_attempt_time()
+        timeout = Settings.TRANSCRIPTION_IDLE_POLL
+        if next_attempt is not None:
+            timeout = min(timeout, max(0.0, next_attempt - time.time()))
+
+        with self.wakeup:
+            if self.running:
+                self.wakeup.wait(timeout)
+
+    def _worker_loop(self):
+        while self.running:
+            try:
+                job = self.database.claim_next_transcription_job(time.time())
+            except Exception as e:
+                print(f"Error claiming transcription job: {e}")
+                job = None
+
+            if job is None:
+                self._wait_for_work()
+                continue
+
+            self._run_job(job)
+
+    def _run_job(self, job: Dict[str, Any]):
+        if job['attempts'] == 1 and job.get('created_at'):
+            # created_at is SQLite's UTC CURRENT_TIMESTAMP
+            created = calendar.timegm(time.strptime(job['created_at'], "%Y-%m-%d %H:%M:%S"))
+            self.queue_wait.record(max(0.0, job['started_at'] - created))
+
+        started = time.perf_counter()
+        try:
+            segments = self.speech_processor.transcribe_segments(job['file_path'], raise_errors=True)
+        except Exception as e:
+            self._retry_or_fail(job, str(e))
+            return
+        finally:
+            self.job_times.record(time.perf_counter() - started)
+
+        text = join_segment_text(segments)
+        if segments:
+            self.database.save_transcription_segments(job['message_id'], segments)
+        if text:
+            self.database.update_message_transcription(job['message_id'], text)
+            print(f"Transcription ({job['message_id']}): {text}")
+        self.database.complete_transcription_job(job['id'], time.time(), None if text else "no speech recognized")
+        self.completed += 1
+
+    def _retry_or_fail(self, job: Dict[str, Any], error: str):
+        if job['attempts'] >= Settings.TRANSCRIPTION_MAX_ATTEMPTS:
+            print(f"Giving up on transcription of message {job['message_id']}: {error}")
+            self.database.fail_transcription_job(job['id'], error, None)
+            self.failed += 1
+            return
+
+        delay = min(Settings.TRANSCRIPTION_RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1),
+                    Settings.TRANSCRIPTION_RETRY_MAX_SECONDS)
+        print(f"Transcription of message {job['message_id']} failed, retrying in {delay:.0f}s")
+        self.database.fail_transcription_job(job['id'], error, time.time() + delay)
+        self.retried += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'depth': self.database.get_transcription_queue_depth(),
+            'completed': self.completed,
+            'retried': self.retried,
+            'failed': self.failed,
+            'job_time': self.job_times.summary(),
+            'queue_wait': self.queue_wait.summary(),
+        }
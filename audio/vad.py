@@ -0,0 +1,185 @@
+import numpy as np
+from typing import List, Tuple
+from config.settings import Settings
+
+Segment = Tuple[int, int]  # (start_sample, end_sample)
+
+def frame_features(samples: np.ndarray, frame_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame RMS and zero-crossing rate for a block of int16 samples"""
+    frame_count = len(samples) // frame_size
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    frames = samples[:frame_count * frame_size].reshape(frame_count, frame_size)
+    frames = frames.astype(np.float32)
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_size - 1)
+    return rms, zcr.astype(np.float32)
+
+def _speech_mask(rms: np.ndarray, zcr: np.ndarray, threshold: float, max_zcr: float) -> np.ndarray:
+    # Noisy, hissy frames cross zero constantly; only accept them when clearly loud
+    return (rms > threshold) & ((zcr <= max_zcr) | (rms > 2.0 * threshold))
+
+def mask_to_segments(mask: np.ndarray, frame_size: int, merge_gap_frames: int = 0) -> List[Segment]:
+    if not mask.any():
+        return []
+
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    if merge_gap_frames > 0 and len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) > merge_gap_frames
+        starts = np.concatenate((starts[:1], starts[1:][keep]))
+        ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+
+    return [(int(s) * frame_size, int(e) * frame_size) for s, e in zip(starts, ends)]
+
+def detect_segments(samples: np.ndarray, sample_rate: int = Settings.SAMPLE_RATE,
+                    frame_ms: int = Settings.VAD_FRAME_MS,
+                    hangover_seconds: float = Settings.VAD_HANGOVER_SECONDS,
+                    min_energy: float = Settings.VAD_ENERGY_THRESHOLD,
+                    noise_ratio: float = Settings.VAD_NOISE_RATIO,
+                    max_zcr: float = Settings.VAD_MAX_ZCR) -> List[Segment]:
+    """Speech segments of a whole recording, computed in one vectorized pass"""
+    frame_size = max(2, int(sample_rate * frame_ms / 1000))
+    rms, zcr = frame_features(samples, frame_size)
+    if len(rms) == 0:
+        return []
+
+    # With the whole file available the quietest frames give the noise floor
+    noise_floor = float(np.percentile(rms, 10))
+    threshold = max(min_energy, noise_floor * noise_ratio)
+
+    mask = _speech_mask(rms, zcr, threshold, max_zcr)
+    hangover_frames = int(hangover_seconds * sample_rate / frame_size)
+    return mask_to_segments(mask, frame_size, hangover_frames)
+
+class VoiceActivityDetector:
+    """Streaming VAD with an adaptive noise floor and hangover smoothing.
+
+    Feed it blocks of int16 samples of any length; all timing is counted in
+    samples so results do not depend on when blocks arrive.
+    """
+
+    def __init__(self, sample_rate: int = Settings.SAMPLE_RATE,
+                 frame_ms: int = Settings.VAD_FRAME_MS,
+                 hangover_seconds: float = Settings.VAD_HANGOVER_SECONDS,
+                 min_energy: float = Settings.VAD_ENERGY_THRESHOLD,
+                 noise_ratio: float = Settings.VAD_NOISE_RATIO,
+                 max_zcr: float = Settings.VAD_MAX_ZCR,
+                 noise_adapt_rate: float = Settings.VAD_NOISE_ADAPT_RATE):
+        self.sample_rate = sample_rate
+        self.frame_size = max(2, int(sample_rate * frame_ms / 1000))
+        self.hangover_samples = int(hangover_seconds * sample_rate)
+        self.min_energy = min_energy
+        self.noise_ratio = noise_ratio
+        self.max_zcr = max_zcr
+        self.noise_adapt_rate = noise_adapt_rate
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = None
+        self.samples_processed = 0
+        self.in_speech = False
+        self.speech_detected = False
+        self.last_speech_end = 0
+        self.segment_start = None
+        self.closed_segments: List[Segment] = []
+        self._remainder = np.empty(0, dtype=np.int16)
+
+    @property
+    def threshold(self) -> float:
+        if self.noise_floor is None:
+            return self.min_energy
+        return max(self.min_energy, self.noise_floor * self.noise_ratio)
+
+    def process(self, block: np.ndarray) -> bool:
+        """Consume a block of samples and return whether speech is active"""
+        if len(self._remainder):
+            block = np.concatenate((self._remainder, block))
+
+        rms, zcr = frame_features(block, self.frame_size)
+        used = len(rms) * self.frame_size
+        self._remainder = block[used:].copy()
+        if len(rms) == 0:
+            return self.in_speech
+
+        if self.noise_floor is None:
+            self.noise_floor = float(rms.min())
+
+        speech = _speech_mask(rms, zcr, self.threshold, self.max_zcr)
+
+        quiet = rms[~speech]
+        if len(quiet):
+            # Track the floor slowly so a long pause cannot become "noise"
+            self.noise_floor += self.noise_adapt_rate * (float(quiet.mean()) - self.noise_floor)
+
+        base = self.samples_processed
+        for index in np.flatnonzero(speech):
+            frame_start = base + int(index) * self.frame_size
+            if self.segment_start is None:
+                self.segment_start = frame_start
+            elif frame_start - self.last_speech_end > self.hangover_samples:
+                self.closed_segments.append((self.segment_start, self.last_speech_end))
+                self.segment_start = frame_start
+            self.last_speech_end = frame_start + self.frame_size
+
+        self.samples_processed += used
+        if speech.any():
+            self.speech_detected = True
+
+        self.in_speech = (self.segment_start is not None and
+                          self.samples_processed - self.last_speech_end <= self.hangover_samples)
+        return self.in_speech
+
+    @property
+    def silence_samples(self) -> int:
+        """Samples since the last speech frame, or since the start if none yet"""
+        return self.samples_processed - self.last_speech_end
+
+    @property
+    def silence_seconds(self) -> float:
+        return self.silence_samples / float(self.sample_rate)
+
+    @property
+    def segments(self) -> List[Segment]:
+        if self.segment_start is None:
+            return list(self.closed_segments)
+        return self.closed_segments + [(self.segment_start, self.last_speech_end)]
+
+def split_at_silence(speech_segments: List[Segment], total_samples: int,
+                     max_samples: int) -> List[Segment]:
+    """Cover [0, total_samples) with chunks of at most max_samples.
+
+    Cuts go in the middle of the pauses between speech segments; a single
+    segment longer than max_samples is cut into equal pieces.
+    """
+    if total_samples <= max_samples:
+        return [(0, total_samples)] if total_samples > 0 else []
+
+    # Candidate cut points: middle of each pause, plus the very end
+    cuts = [(end + next_start) // 2
+            for (_, end), (next_start, _) in zip(speech_segments, speech_segments[1:])]
+    cuts.append(total_samples)
+
+    chunks = []
+    chunk_start = 0
+    previous_cut = 0
+    for cut in cuts:
+        if cut - chunk_start > max_samples and previous_cut > chunk_start:
+            chunks.append((chunk_start, previous_cut))
+            chunk_start = previous_cut
+        while cut - chunk_start > max_samples:
+            # No pause to cut at, so split the long stretch evenly
+            pieces = -(-(cut - chunk_start) // max_samples)
+            step = -(-(cut - chunk_start) // pieces)
+            chunks.append((chunk_start, chunk_start + step))
+            chunk_start += step
+        previous_cut = cut
+
+    if chunk_start < total_samples:
+        chunks.append((chunk_start, total_samples))
+    return chunks
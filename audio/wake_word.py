@@ -1,7 +1,9 @@
 import threading
 import time
-from typing import Callable, Optional
+from typing import Callable, Optional, Dict, Any
 from config.settings import Settings
+from audio.capture_bus import AudioCaptureBus
+from audio.metrics import LatencyHistogram
 
 try:
     import pvporcupine
@@ -11,13 +13,25 @@ except ImportError:
     print("Porcupine not available, using mock wake word detection")
 
 class WakeWordDetector:
-    def __init__(self, wake_word_callback: Callable):
+    def __init__(self, wake_word_callback: Callable, capture_bus: Optional[AudioCaptureBus] = None,
+                 engine=None):
         self.wake_word_callback = wake_word_callback
+        self.capture_bus = capture_bus
         self.listening = False
         self.detection_thread = None
         self.porcupine = None
-
-        if PORCUPINE_AVAILABLE and Settings.PICOVOICE_ACCESS_KEY:
+        # Capture bus position just after the wake word, for pre-roll
+        self.last_detection_position: Optional[int] = None
+
+        # Per-frame cost and how far behind the microphone the loop runs
+        self.frame_times = LatencyHistogram("wake word frame processing")
+        self.queue_lag = LatencyHistogram("wake word queue lag")
+        self.frames_processed = 0
+
+        if engine is not None:
+            # Anything with Porcupine's sample_rate/frame_length/process/delete
+            self.porcupine = engine
+        elif PORCUPINE_AVAILABLE and Settings.PICOVOICE_ACCESS_KEY:
             try:
                 # Check if custom wake word model exists
                 import os
@@ -71,44 +85,75 @@ class WakeWordDetector:
         if self.detection_thread and self.detection_thread.is_alive():
             self.detection_thread.join()
 
+        if self.frames_processed:
+            print(self.frame_times.format())
+            print(self.queue_lag.format())
+
+    def get_stats(self) -> Dict[str, Any]:
+        audio_seconds = 0.0
+        if self.porcupine and self.frames_processed:
+            audio_seconds = self.frames_processed * self.porcupine.frame_length / float(self.porcupine.sample_rate)
+        return {
+            'frames_processed': self.frames_processed,
+            'frame_processing': self.frame_times.summary(),
+            'queue_lag': self.queue_lag.summary(),
+            # Fraction of one core spent in Porcupine per second of audio
+            'real_time_factor': self.frame_times.total / audio_seconds if audio_seconds else 0.0,
+        }
+
+    def _process_frame(self, pcm, subscription, sample_rate: float) -> bool:
+        self.queue_lag.record(subscription.lag_samples() / sample_rate)
+        started = time.perf_counter()
+        keyword_index = self.porcupine.process(pcm)
+        self.frame_times.record(time.perf_counter() - started)
+        self.frames_processed += 1
+
+        if keyword_index < 0:
+            return False
+
+        print(f"Wake word detected: {Settings.WAKE_WORD}")
+        self.last_detection_position = subscription.position
+        self.wake_word_callback()
+        return True
+
     def _porcupine_detection_loop(self):
-        import pyaudio
+        capture_bus = self.capture_bus
+        owns_capture_bus = capture_bus is None
+        if owns_capture_bus:
+            capture_bus = AudioCaptureBus(
+                sample_rate=self.porcupine.sample_rate,
+                chunk_size=self.porcupine.frame_length
+            )
 
-        audio = pyaudio.PyAudio()
-        stream = None
+        if capture_bus.sample_rate != self.porcupine.sample_rate:
+            print(f"Capture rate {capture_bus.sample_rate} does not match Porcupine rate {self.porcupine.sample_rate}")
+            return
 
-        try:
-            stream = audio.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
+        if not capture_bus.is_running() and not capture_bus.start():
+            print("Error setting up wake word detection: audio capture unavailable")
+            return
+
+        subscription = capture_bus.subscribe(self.porcupine.frame_length)
+        sample_rate = float(capture_bus.sample_rate)
 
+        try:
             print("Porcupine wake word detection active")
 
             while self.listening:
                 try:
-                    pcm = stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-                    pcm = [int(x) for x in pcm]
-
-                    keyword_index = self.porcupine.process(pcm)
-                    if keyword_index >= 0:
-                        print(f"Wake word detected: {Settings.WAKE_WORD}")
-                        self.wake_word_callback()
+                    # int16 view straight out of the ring buffer, no per-frame list
+                    pcm = subscription.read(timeout=0.5, copy=False)
+                    if pcm is not None:
+                        self._process_frame(pcm, subscription, sample_rate)
 
                 except Exception as e:
                     if self.listening:  # Only log if we're still supposed to be listening
                         print(f"Error in wake word detection: {e}")
 
-        except Exception as e:
-            print(f"Error setting up wake word detection: {e}")
-
         finally:
-            if stream:
-                stream.close()
-            audio.terminate()
+            subscription.close()
+            if owns_capture_bus:
+                capture_bus.stop()
 
     def _mock_detection_loop(self):
         print("Mock wake word detection active - press Enter to simulate wake word")
@@ -168,8 +213,9 @@ class KeyboardWakeWordDetector:
     def cleanup(self):
         self.stop_listening()
 
-def get_wake_word_detector(callback: Callable, use_keyboard: bool = False):
+def get_wake_word_detector(callback: Callable, use_keyboard: bool = False,
+                           capture_bus: Optional[AudioCaptureBus] = None):
     if use_keyboard:
         return KeyboardWakeWordDetector(callback)
     else:
-        return WakeWordDetector(callback)
\ No newline at end of file
+        return WakeWordDetector(callback, capture_bus)
\ No newline at end of file
@@ -0,0 +1,203 @@
+import bisect
+import os
+import time
+import numpy as np
+from typing import List, Tuple, Dict, Any, Optional
+from config.settings import Settings
+from audio.audio_io import read_pcm
+from audio.capture_bus import AudioCaptureBus
+from audio.metrics import LatencyHistogram
+from audio.vad import VoiceActivityDetector
+from audio.wake_word import WakeWordDetector
+
+class ReplayCaptureBus(AudioCaptureBus):
+    """Capture bus fed from files instead of the microphone.
+
+    feed() writes as fast as the slowest subscriber can keep up, so the
+    detector runs through the exact live code path faster than real time.
+    """
+
+    def __init__(self, sample_rate: int = Settings.SAMPLE_RATE,
+                 chunk_size: int = Settings.CHUNK_SIZE):
+        super().__init__(sample_rate=sample_rate, chunk_size=chunk_size, callback_mode=False)
+        # End position and perf_counter time of each chunk handed to the readers
+        self.chunk_ends: List[int] = []
+        self.chunk_times: List[float] = []
+
+    def start(self) -> bool:
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+        for subscriber in self.subscribers:
+            subscriber.data_ready.set()
+
+    def _max_lag(self) -> int:
+        return max((s.lag_samples() for s in self.subscribers), default=0)
+
+    def feed(self, samples: np.ndarray):
+        # Stay only a few chunks ahead so queue lag still means something
+        max_lag = 4 * self.chunk_size
+        for offset in range(0, len(samples), self.chunk_size):
+            while self._max_lag() > max_lag:
+                time.sleep(0.0005)
+            chunk = samples[offset:offset + self.chunk_size]
+            self.write(chunk)
+            self.chunk_ends.append(self.write_position)
+            self.chunk_times.append(time.perf_counter())
+
+    def write_time(self, position: int) -> Optional[float]:
+        """Wall time at which the sample at `position` became readable"""
+        index = bisect.bisect_left(self.chunk_ends, position)
+        return self.chunk_times[index] if index < len(self.chunk_ends) else None
+
+class EnergyKeywordEngine:
+    """Deterministic local stand-in for Porcupine.
+
+    Fires at the end of a short burst of speech (wake-word sized) that follows
+    a quiet gap. It has Porcupine's interface, so it can be dropped into
+    WakeWordDetector when there is no access key or device.
+    """
+
+    def __init__(self, sample_rate: int = Settings.SAMPLE_RATE, frame_length: int = 512,
+                 min_word_seconds: float = 0.2, max_word_seconds: float = 1.2,
+                 min_gap_seconds: float = 0.5):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.min_word = int(min_word_seconds * sample_rate)
+        self.max_word = int(max_word_seconds * sample_rate)
+        self.min_gap = int(min_gap_seconds * sample_rate)
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate, hangover_seconds=0.15)
+        self.reported = 0
+
+    def process(self, pcm) -> int:
+        if len(pcm) != self.frame_length:
+            raise ValueError(f"Expected {self.frame_length} samples, got {len(pcm)}")
+
+        self.vad.process(np.asarray(pcm, dtype=np.int16))
+        segments = self.vad.segments
+        if self.vad.in_speech:
+            segments = segments[:-1]
+
+        detected = -1
+        while self.reported < len(segments):
+            start, end = segments[self.reported]
+            gap_before = start - (segments[self.reported - 1][1] if self.reported else 0)
+            if self.min_word <= end - start <= self.max_word and gap_before >= self.min_gap:
+                detected = 0
+            self.reported += 1
+        return detected
+
+    def delete(self):
+        pass
+
+def load_labels(wav_path: str) -> List[Tuple[float, float]]:
+    """Utterance (start, end) seconds from an Audacity label file next to the WAV"""
+    label_path = os.path.splitext(wav_path)[0] + ".txt"
+    labels = []
+    if not os.path.exists(label_path):
+        return labels
+
+    with open(label_path) as f:
+        for line in f:
+            fields = line.replace(',', '\t').split()
+            if len(fields) >= 2:
+                labels.append((float(fields[0]), float(fields[1])))
+    return labels
+
+def replay_files(paths: List[str], engine=None, tolerance: float = 1.0) -> Dict[str, Any]:
+    """Stream recordings through WakeWordDetector and score its detections"""
+    engine = engine or EnergyKeywordEngine()
+    bus = ReplayCaptureBus(sample_rate=engine.sample_rate)
+
+    detections: List[Tuple[int, float]] = []
+    detector = None
+
+    def on_wake_word():
+        detections.append((detector.last_detection_position, time.perf_counter()))
+
+    detector = WakeWordDetector(on_wake_word, capture_bus=bus, engine=engine)
+    latency = LatencyHistogram("utterance end to callback")
+    files = []
+    audio_seconds = 0.0
+
+    bus.start()
+    detector.start_listening()
+    while detector.listening and not bus.subscribers:
+        time.sleep(0.001)
+    if not bus.subscribers:
+        raise RuntimeError("wake word detector did not subscribe to the replay bus")
+    subscription_start = bus.subscribers[0].position
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    try:
+        for path in paths:
+            samples, sample_rate = read_pcm(path)
+            if sample_rate != engine.sample_rate:
+                print(f"Skipping {path}: {sample_rate} Hz, engine expects {engine.sample_rate} Hz")
+                continue
+
+            file_start = bus.write_position
+            first_detection = len(detections)
+            bus.feed(samples)
+
+            # Let the detector finish every whole frame before scoring
+            expected_frames = (bus.write_position - subscription_start) // engine.frame_length
+            while detector.frames_processed < expected_frames and detector.detection_thread.is_alive():
+                time.sleep(0.001)
+
+            duration = len(samples) / float(sample_rate)
+            audio_seconds += duration
+            labels = load_labels(path)
+            matched = [False] * len(labels)
+            hits, false_accepts = [], []
+
+            for position, called_at in detections[first_detection:]:
+                offset = (position - file_start) / float(sample_rate)
+                match = next((i for i, (start, end) in enumerate(labels)
+                              if not matched[i] and start <= offset <= end + tolerance), None)
+                if match is None:
+                    false_accepts.append(offset)
+                    continue
+
+                matched[match] = True
+                # Audio still to come after the utterance, plus processing delay
+                written_at = bus.write_time(position) or called_at
+                delay = offset - labels[match][1] + (called_at - written_at)
+                latency.record(max(0.0, delay))
+                hits.append({'offset': offset, 'utterance_end': labels[match][1], 'latency': delay})
+
+            files.append({
+                'path': path,
+                'duration': duration,
+                'detections': [h['offset'] for h in hits] + false_accepts,
+                'hits': hits,
+                'false_accepts': false_accepts,
+                'misses': [labels[i] for i, m in enumerate(matched) if not m],
+                'labelled': len(labels),
+            })
+    finally:
+        detector.stop_listening()
+        detector.cleanup()
+        bus.stop()
+
+    wall = time.perf_counter() - wall_start
+    total_false = sum(len(f['false_accepts']) for f in files)
+    total_labels = sum(f['labelled'] for f in files)
+    total_hits = sum(len(f['hits']) for f in files)
+
+    return {
+        'files': files,
+        'audio_seconds': audio_seconds,
+        'wall_seconds': wall,
+        'speedup': audio_seconds / wall if wall else 0.0,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'detection_rate': total_hits / total_labels if total_labels else None,
+        'false_accepts': total_false,
+        'false_accepts_per_hour': total_false / (audio_seconds / 3600.0) if audio_seconds else 0.0,
+        'frame_processing': detector.frame_times.summary(),
+        'queue_lag': detector.queue_lag.summary(),
+        'latency': latency.summary(),
+    }
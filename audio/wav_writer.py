@@ -0,0 +1,80 @@
+import os
+import struct
+from config.settings import Settings
+
+class StreamingWavWriter:
+    """Writes PCM to a WAV file as it arrives, keeping the header playable"""
+
+    HEADER_SIZE = 44
+
+    def __init__(self, filename: str, channels: int = Settings.CHANNELS,
+                 sample_width: int = 2, sample_rate: int = Settings.SAMPLE_RATE,
+                 header_update_interval: float = Settings.WAV_HEADER_UPDATE_INTERVAL):
+        self.filename = filename
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate
+        self.data_bytes = 0
+
+        bytes_per_second = sample_rate * channels * sample_width
+        self.header_update_bytes = max(1, int(header_update_interval * bytes_per_second))
+        self._bytes_since_update = 0
+
+        self.file = open(filename, 'wb')
+        self.file.write(self._build_header())
+
+    def _build_header(self) -> bytes:
+        block_align = self.channels * self.sample_width
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + self.data_bytes, b'WAVE',
+            b'fmt ', 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * block_align, block_align, self.sample_width * 8,
+            b'data', self.data_bytes
+        )
+
+    def write(self, data: bytes):
+        if self.file is None:
+            raise ValueError("WAV writer is closed")
+
+        self.file.write(data)
+        self.data_bytes += len(data)
+        self._bytes_since_update += len(data)
+
+        if self._bytes_since_update >= self.header_update_bytes:
+            self.update_header()
+
+    def update_header(self):
+        # Patch the RIFF and data chunk sizes so the file is valid if we stop here
+        self.file.seek(0)
+        self.file.write(self._build_header())
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._bytes_since_update = 0
+
+    @property
+    def frames_written(self) -> int:
+        return self.data_bytes // (self.channels * self.sample_width)
+
+    @property
+    def duration(self) -> float:
+        return self.frames_written / float(self.sample_rate)
+
+    def close(self):
+        if self.file is None:
+            return
+
+        if self.data_bytes % 2:
+            # RIFF chunks are word aligned
+            self.file.write(b'\x00')
+
+        self.update_header()
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -12,12 +12,30 @@ class Settings:
     SAMPLE_RATE = 16000
     CHUNK_SIZE = 1024
     CHANNELS = 1
-    AUDIO_FORMAT = "WAV"
+    # WAV, FLAC or OPUS; compressed formats need soundfile. Only WAV is crash
+    # safe: its header is patched and fsynced every WAV_HEADER_UPDATE_INTERVAL,
+    # while a FLAC/Opus file is only valid once recording stops cleanly
+    AUDIO_FORMAT = "FLAC"
+    WAV_HEADER_UPDATE_INTERVAL = 1.0  # seconds of audio between header patches
+
+    # Shared microphone capture
+    CAPTURE_RING_SECONDS = 10.0  # history kept in the capture ring buffer
+    CAPTURE_CALLBACK_MODE = True  # PortAudio callback capture instead of a blocking read thread
+    RECORDING_PREROLL_SECONDS = 0.5  # audio from before recording start to keep
 
     # File paths
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     AUDIO_DIR = os.path.join(BASE_DIR, "audio_files")
     DATABASE_PATH = os.path.join(BASE_DIR, "muninn.db")
+    CONTENT_CACHE_PATH = os.path.join(BASE_DIR, "cache.db")  # safe to delete
+    CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+    # Database connections (one per thread, kept open)
+    DATABASE_SYNCHRONOUS = "NORMAL"  # with WAL, only the last commits can be lost on power cut, never corruption
+    DATABASE_CACHE_KB = 8192  # page cache per connection
+    DATABASE_MMAP_BYTES = 64 * 1024 * 1024  # read the database through a memory map up to this size
+    DATABASE_BUSY_TIMEOUT = 10.0  # seconds to wait for another thread's write lock
+    DATABASE_CACHED_STATEMENTS = 128  # compiled statements kept per connection
 
     # Hardware detection
     IS_RASPBERRY_PI = platform.machine() in ["armv7l", "aarch64"]
@@ -28,6 +46,19 @@ class Settings:
     # Custom wake word file path
     WAKE_WORD_MODEL_PATH = os.path.join(BASE_DIR, "munin_en_raspberry-pi_v3_0_0.ppn")
 
+    # Speech-to-text: "google" (online), "vosk" (offline) or "standin" (tests)
+    STT_BACKEND = os.getenv("MUNINN_STT_BACKEND", "google")
+    VOSK_MODEL_PATH = os.path.join(BASE_DIR, "models", "vosk-model-small-en-us-0.15")
+    STT_SEGMENT_MAX_SECONDS = 30.0  # long recordings are split at pauses into pieces this long
+    STT_SEGMENT_WORKERS = 4  # pieces transcribed at once, shared by all transcription jobs
+
+    # Background transcription queue
+    TRANSCRIPTION_WORKERS = 2
+    TRANSCRIPTION_MAX_ATTEMPTS = 6
+    TRANSCRIPTION_RETRY_BASE_SECONDS = 30.0  # doubled after each failed attempt
+    TRANSCRIPTION_RETRY_MAX_SECONDS = 3600.0
+    TRANSCRIPTION_IDLE_POLL = 60.0  # seconds between queue checks when idle
+
     # LED settings
     LED_COUNT = 60
     LED_PIN = 18
@@ -42,7 +73,46 @@ class Settings:
 
     # Voice Activity Detection
     VAD_SILENCE_DURATION = 3.0  # seconds of silence before stopping recording
-    VAD_ENERGY_THRESHOLD = 300
+    VAD_ENERGY_THRESHOLD = 300  # minimum RMS counted as speech, whatever the noise floor
+    VAD_FRAME_MS = 20
+    VAD_NOISE_RATIO = 3.0  # speech must be this many times louder than the noise floor
+    VAD_MAX_ZCR = 0.35  # zero-crossing rate above which quiet frames are treated as noise
+    VAD_HANGOVER_SECONDS = 0.3  # keep speech active this long after the last speech frame
+    VAD_NOISE_ADAPT_RATE = 0.05
+
+    # Spoken command capture after the wake word
+    COMMAND_PREROLL_SECONDS = 0.3  # used when the wake word position is unknown
+    COMMAND_ENDPOINT_SILENCE = 0.7  # silence that ends a command
+    COMMAND_NO_SPEECH_TIMEOUT = 5.0  # give up if nothing is said
+    COMMAND_MAX_SECONDS = 8.0
+    COMMAND_NAME_MIN_CONFIDENCE = 0.7  # below this a heard name is not acted on
+    COMMAND_NAME_MIN_SPELLING = 0.7  # a name that sounds right must also be spelled this close
+
+    # Post-processing of finished recordings
+    POSTPROCESS_WORKERS = 2
+    POSTPROCESS_MAX_PENDING = 8  # jobs queued or running before new ones are refused
+    POSTPROCESS_TRIM_PADDING = 0.3  # seconds of silence kept around the speech
+    POSTPROCESS_TARGET_DBFS = -20.0  # speech loudness target
+    POSTPROCESS_PEAK_DBFS = -1.0
+    POSTPROCESS_MAX_GAIN_DB = 20.0
+    POSTPROCESS_PEAK_BUCKETS = 200  # points in the stored waveform overview
+
+    # Playback
+    PLAYER_CACHE_MAX_BYTES = 512 * 1024 * 1024  # decoded audio kept in memory, ~4.5 hours at 16kHz
+    PLAYER_CACHE_MAX_MEMORY_FRACTION = 0.1  # never more than this share of RAM on smaller boards
+    PLAYER_CHUNK_SECONDS = 1.0  # audio read from disk at a time while streaming
+    PLAYER_POSITION_SAVE_SECONDS = 10.0  # how often the resume position is saved during playback
+    PLAYER_RESUME_MIN_SECONDS = 5.0  # positions this close to either end are not worth resuming
+
+    # Prefetch: decode the messages most likely to be asked for next while idle
+    PREFETCH_ENABLED = True
+    PREFETCH_DELAY_SECONDS = 5.0  # wait this long in SLEEPING before warming anything
+    PREFETCH_MEMBERS = 3  # family members whose newest message is kept warm
+    PREFETCH_HISTORY_DAYS = 60
+    PREFETCH_HALF_LIFE_DAYS = 14.0  # a play this old counts half as much as one today
+    PREFETCH_HOUR_WEIGHT = 3.0  # extra weight for plays within an hour of the time now
+    PREFETCH_NEW_MESSAGE_DAYS = 3  # unheard messages this new are likely to be asked for
+    PREFETCH_NEW_MESSAGE_WEIGHT = 2.0
 
     @classmethod
     def ensure_directories(cls):
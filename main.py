@@ -15,12 +15,18 @@ from config.settings import Settings
 from config.family_names import FAMILY_MEMBERS
 from state.machine import StateMachine, MuninnState
 from storage.database import DatabaseManager
+from storage.content_cache import get_content_cache
 from storage.file_manager import FileManager
 from led.controller import LEDController
+from audio.capture_bus import get_capture_bus
 from audio.wake_word import get_wake_word_detector
+from audio.command_capture import get_command_capture
 from audio.recorder import get_audio_recorder
 from audio.player import get_audio_player
+from audio.prefetcher import Prefetcher
 from audio.speech_to_text import get_speech_processor
+from audio.postprocess import RecordingPostProcessor
+from audio.transcription_queue import TranscriptionQueue
 
 class MuninnVoiceAssistant:
     def __init__(self):
@@ -29,14 +35,27 @@ class MuninnVoiceAssistant:
         # Core components
         self.state_machine = StateMachine()
         self.database = DatabaseManager()
+        self.content_cache = get_content_cache()
         self.file_manager = FileManager()
         self.led_controller = LEDController()
-        self.speech_processor = get_speech_processor()
+        self.speech_processor = get_speech_processor(self.content_cache)
 
-        # Audio components
-        self.wake_word_detector = get_wake_word_detector(self.on_wake_word_detected)
-        self.audio_recorder = get_audio_recorder()
+        # Audio components share one microphone stream when it is available
+        self.capture_bus = get_capture_bus()
+        self.wake_word_detector = get_wake_word_detector(
+            self.on_wake_word_detected, capture_bus=self.capture_bus
+        )
+        self.audio_recorder = get_audio_recorder(self.capture_bus)
         self.audio_player = get_audio_player()
+        self.post_processor = RecordingPostProcessor(cache=self.content_cache)
+        self.transcription_queue = TranscriptionQueue(self.database, self.speech_processor)
+        self.command_capture = get_command_capture(
+            self.capture_bus, self.speech_processor, self._on_command_heard
+        )
+        self.prefetcher = None
+        if Settings.PREFETCH_ENABLED:
+            self.prefetcher = Prefetcher(self.database, self.audio_player,
+                                         lambda: self.state_machine.is_state(MuninnState.SLEEPING))
 
         # State tracking
         self.current_recording_member: Optional[str] = None
@@ -95,6 +114,19 @@ class MuninnVoiceAssistant:
         # Start the state machine
         self.state_machine.start()
 
+        # Open the shared microphone before any consumer subscribes
+        if self.capture_bus and not self.capture_bus.start():
+            print("Shared audio capture failed to start")
+
+        # Transcribe in the background, picking up anything left from last run
+        self.transcription_queue.start()
+        self.transcription_queue.enqueue_backlog()
+
+        # Warm likely requests while idle; the state machine starts out asleep
+        if self.prefetcher:
+            self.prefetcher.start()
+            self.prefetcher.on_idle()
+
         # Start wake word detection
         self.wake_word_detector.start_listening()
 
@@ -124,6 +156,18 @@ class MuninnVoiceAssistant:
         self.wake_word_detector.cleanup()
         self.audio_recorder.cleanup()
         self.audio_player.cleanup()
+        self.post_processor.shutdown()
+        self.transcription_queue.stop()
+        if self.prefetcher:
+            self.prefetcher.stop()
+            print(f"Prefetch stats: {self.prefetcher.get_stats()}")
+        self.speech_processor.shutdown()
+        if self.capture_bus:
+            self.capture_bus.stop()
+            print(f"Capture stats: {self.capture_bus.get_stats()}")
+        if self.content_cache:
+            print(f"Content cache stats: {self.content_cache.get_stats()}")
+        self.database.close()
 
         print("Muninn shutdown complete")
 
@@ -134,12 +178,21 @@ class MuninnVoiceAssistant:
     # State callbacks
     def _on_sleeping(self, context: dict):
         print("State: Sleeping - waiting for wake word")
+        if self.command_capture:
+            self.command_capture.cancel()
         self.led_controller.set_idle_mode()
+        if self.prefetcher:
+            self.prefetcher.on_idle()
 
     def _on_listening(self, context: dict):
         print("State: Listening for command")
         self.led_controller.set_listening_mode()
 
+        # Capture the command from right after the wake word, ended by silence
+        if self.command_capture and self.command_capture.start(
+                self.wake_word_detector.last_detection_position):
+            return
+
         # Start a timeout thread
         threading.Thread(target=self._listening_timeout).start()
 
@@ -155,10 +208,11 @@ class MuninnVoiceAssistant:
         self.current_recording_member = family_member
         self.current_recording_file = file_path
 
-        success = self.audio_recorder.start_recording(file_path)
+        success = self.audio_recorder.start_recording(file_path, self._on_recording_silence)
         if not success:
             print("Failed to start recording")
-            self.state_machine.transition_to(MuninnState.SLEEPING)
+            # Still inside the RECORDING state callback, which holds the state lock
+            threading.Timer(0, lambda: self.state_machine.transition_to(MuninnState.SLEEPING)).start()
 
     def _on_playing(self, context: dict):
         family_member = context.get('family_member')
@@ -188,11 +242,14 @@ class MuninnVoiceAssistant:
 
             print(f"Message saved with ID: {message_id}")
 
-            # Try to transcribe
-            transcription = self.speech_processor.transcribe_audio_file(self.current_recording_file)
-            if transcription:
-                self.database.update_message_transcription(message_id, transcription)
-                print(f"Transcription: {transcription}")
+            # Trim and normalize, then queue transcription, off the state machine thread
+            file_path = self.current_recording_file
+            submitted = self.post_processor.submit(
+                file_path,
+                lambda result: self._on_recording_processed(message_id, file_path, result)
+            )
+            if not submitted:
+                self._on_recording_processed(message_id, file_path, None)
 
         # Clear recording state
         self.current_recording_member = None
@@ -201,11 +258,48 @@ class MuninnVoiceAssistant:
         # Return to sleeping state
         threading.Timer(2.0, lambda: self.state_machine.transition_to(MuninnState.SLEEPING)).start()
 
+    def _on_recording_processed(self, message_id: int, file_path: str, result: Optional[dict]):
+        if result:
+            self.database.update_message_duration(message_id, result['duration'])
+            self.database.save_message_analysis(
+                message_id,
+                result['trim_start'],
+                result['trim_end'],
+                result['gain_db'],
+                result['peaks']
+            )
+
+        self.transcription_queue.enqueue(message_id, file_path)
+
     # Event handlers
+    def _on_recording_silence(self):
+        if self.state_machine.is_state(MuninnState.RECORDING):
+            self.state_machine.transition_to(MuninnState.PROCESSING)
+
+    def _on_command_heard(self, text: Optional[str], speech_end_time: Optional[float]):
+        command = None
+        if text:
+            command = self.process_text_command(text)
+            self.command_capture.record_command_executed(speech_end_time)
+
+        # Playback was paused to listen; carry on unless asked to pause
+        if (self.state_machine.is_state(MuninnState.PLAYING) and
+                self.audio_player.is_paused() and command != "pause"):
+            self.audio_player.resume()
+
+        # Anything that did not start recording or playback goes back to sleep
+        if self.state_machine.is_state(MuninnState.LISTENING):
+            self.state_machine.transition_to(MuninnState.SLEEPING)
+
     def on_wake_word_detected(self):
         if self.state_machine.is_state(MuninnState.SLEEPING):
             print("Wake word detected!")
             self.state_machine.transition_to(MuninnState.LISTENING)
+        elif self.state_machine.is_state(MuninnState.PLAYING) and self.command_capture:
+            # Listen for skip/pause/stop without leaving playback
+            print("Wake word detected during playback")
+            self.audio_player.pause()
+            self.command_capture.start(self.wake_word_detector.last_detection_position)
 
     def _listening_timeout(self):
         time.sleep(10)  # 10 second timeout
@@ -215,31 +309,58 @@ class MuninnVoiceAssistant:
 
     def _play_messages_for_member(self, family_member: str):
         messages = self.database.get_messages_by_family_member(family_member, limit=5)
-        if not messages:
+        file_paths = []
+        message_ids = []
+        for message in messages:
+            if self.file_manager.file_exists(message['file_path']):
+                file_paths.append(message['file_path'])
+                message_ids.append(message['id'])
+            else:
+                print(f"File not found: {message['file_path']}")
+
+        if not file_paths:
             print(f"No messages found for {family_member}")
             threading.Timer(2.0, lambda: self.state_machine.transition_to(MuninnState.SLEEPING)).start()
             return
 
-        def play_next_message(index=0):
-            if index >= len(messages):
-                print("Finished playing all messages")
-                self.state_machine.transition_to(MuninnState.SLEEPING)
-                return
+        def on_track(index, file_path):
+            print(f"Playing message {index + 1}/{len(file_paths)}")
+            self._record_play(message_ids[index], family_member)
 
-            message = messages[index]
-            file_path = message['file_path']
+        # Pick up where the listener left off in any message they stopped part way through
+        positions = self.database.get_playback_positions(message_ids)
+        start_positions = [positions.get(message_id, 0.0) for message_id in message_ids]
 
-            if self.file_manager.file_exists(file_path):
-                print(f"Playing message {index + 1}/{len(messages)}")
-                self.audio_player.play_file(
-                    file_path,
-                    lambda: play_next_message(index + 1)
-                )
-            else:
-                print(f"File not found: {file_path}")
-                play_next_message(index + 1)
+        def on_position(index, file_path, position, duration):
+            self._save_playback_position(message_ids[index], position, duration)
+
+        if self.prefetcher:
+            self.prefetcher.record_request(file_paths[0])
+        if not self.audio_player.play_playlist(file_paths, self._on_playlist_finished, on_track,
+                                               start_positions, on_position):
+            # Still inside the PLAYING state callback, which holds the state lock
+            threading.Timer(0, lambda: self.state_machine.transition_to(MuninnState.SLEEPING)).start()
+
+    def _record_play(self, message_id: int, family_member: str):
+        try:
+            self.database.record_play(message_id, family_member, time.time())
+        except Exception as e:
+            print(f"Error recording play history: {e}")
 
-        play_next_message()
+    def _save_playback_position(self, message_id: int, position: float, duration: float):
+        try:
+            if Settings.PLAYER_RESUME_MIN_SECONDS <= position <= duration - Settings.PLAYER_RESUME_MIN_SECONDS:
+                self.database.save_playback_position(message_id, position)
+            else:
+                self.database.clear_playback_position(message_id)
+        except Exception as e:
+            print(f"Error saving playback position: {e}")
+
+    def _on_playlist_finished(self):
+        print("Finished playing all messages")
+        print(f"Playback stats: {self.audio_player.get_stats()}")
+        if self.state_machine.is_state(MuninnState.PLAYING):
+            self.state_machine.transition_to(MuninnState.SLEEPING)
 
     def _play_recent_messages(self):
         messages = self.database.get_recent_messages(days=7)
@@ -254,25 +375,35 @@ class MuninnVoiceAssistant:
 
         if self.file_manager.file_exists(file_path):
             print(f"Playing recent message from {message['family_member']}")
-            self.audio_player.play_file(
-                file_path,
-                lambda: self.state_machine.transition_to(MuninnState.SLEEPING)
-            )
+            start = self.database.get_playback_positions([message['id']]).get(message['id'], 0.0)
+            if self.prefetcher:
+                self.prefetcher.record_request(file_path)
+            if self.audio_player.play_playlist(
+                [file_path],
+                lambda: self.state_machine.transition_to(MuninnState.SLEEPING),
+                lambda index, path: self._record_play(message['id'], message['family_member']),
+                start_positions=[start],
+                position_callback=lambda index, path, position, duration:
+                    self._save_playback_position(message['id'], position, duration)
+            ):
+                return
         else:
             print(f"File not found: {file_path}")
-            self.state_machine.transition_to(MuninnState.SLEEPING)
+        threading.Timer(0, lambda: self.state_machine.transition_to(MuninnState.SLEEPING)).start()
 
     # Command processing (for future keyboard commands)
-    def process_text_command(self, text: str):
+    def process_text_command(self, text: str) -> str:
         command, target = self.speech_processor.process_command(text)
 
         if command == "record":
             if not target:
                 print("Please specify a family member name")
-                return
+                return command
             self.state_machine.transition_to(MuninnState.RECORDING, {'family_member': target})
 
         elif command == "play":
+            if self.audio_player.is_playing_audio():
+                self.audio_player.stop_playback()
             if target and target in FAMILY_MEMBERS:
                 self.state_machine.transition_to(MuninnState.PLAYING, {'family_member': target})
             else:
@@ -283,6 +414,18 @@ class MuninnVoiceAssistant:
             self.audio_player.stop_playback()
             self.state_machine.transition_to(MuninnState.SLEEPING)
 
+        elif command == "skip":
+            self.audio_player.skip()
+
+        elif command == "previous":
+            self.audio_player.previous()
+
+        elif command == "pause":
+            self.audio_player.pause()
+
+        elif command == "resume":
+            self.audio_player.resume()
+
         elif command == "list":
             self._list_messages()
 
@@ -292,11 +435,18 @@ class MuninnVoiceAssistant:
         else:
             print(f"Unknown command: {text}")
 
+        return command
+
     def _list_messages(self):
         counts = self.database.get_family_member_count()
         print("\nMessage counts by family member:")
         for member, count in counts.items():
             print(f"  {member}: {count} messages")
+
+        depth = self.database.get_transcription_queue_depth()
+        pending = depth.get('pending', 0) + depth.get('running', 0)
+        if pending:
+            print(f"  ({pending} recordings waiting for transcription)")
         print()
 
     def _show_help(self):
@@ -304,6 +454,7 @@ class MuninnVoiceAssistant:
         print("  'Muninn, remember this' - Start recording")
         print("  'Muninn, play [name]'s messages' - Play messages")
         print("  'Muninn, stop' - Stop current operation")
+        print("  'Muninn, skip' / 'go back' / 'pause' / 'continue' - Control playback")
         print("  'Muninn, list' - Show message counts")
         print()
 
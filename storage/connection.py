@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Tuple
+from config.settings import Settings
+
+class ConnectionManager:
+    """One long-lived SQLite connection per thread.
+
+    Opening a connection reads the schema and sets up locking every time,
+    so each thread keeps its own connection instead, along with its cache of
+    compiled statements. Connections run in WAL mode, so readers are not
+    blocked while the recorder or transcription threads write. Connections
+    left by threads that have exited are closed the next time one is opened.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.open_connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, with rows as plain tuples.
+
+        Prefer transaction(); `with manager.connection() as conn:` commits
+        on exit even inside another transaction() block.
+        """
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self.local.conn = conn
+        conn.row_factory = None
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """This thread's connection for one unit of work.
+
+        Commits when the outermost transaction() block exits and rolls back
+        if it raises, so nested blocks share a single commit.
+        """
+        conn = self.connection()
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0 and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if depth == 0 and conn.in_transaction:
+                conn.commit()
+        finally:
+            self.local.depth = depth
+
+    def _open(self) -> sqlite3.Connection:
+        # Only the owning thread uses it, but close_all() runs on another
+        conn = sqlite3.connect(self.db_path, timeout=Settings.DATABASE_BUSY_TIMEOUT,
+                               cached_statements=Settings.DATABASE_CACHED_STATEMENTS,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute(f'PRAGMA synchronous = {Settings.DATABASE_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA cache_size = -{Settings.DATABASE_CACHE_KB}')
+        conn.execute(f'PRAGMA mmap_size = {Settings.DATABASE_MMAP_BYTES}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+
+        with self.lock:
+            live = []
+            for thread, other in self.open_connections:
+                if thread.is_alive():
+                    live.append((thread, other))
+                else:
+                    other.close()
+            live.append((threading.current_thread(), conn))
+            self.open_connections = live
+        return conn
+
+    def close_all(self):
+        with self.lock:
+            for _, conn in self.open_connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"Error closing database connection: {e}")
+            self.open_connections = []
+        # Threads that carry on get a fresh connection next time
+        self.local = threading.local()
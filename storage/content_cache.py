@@ -0,0 +1,140 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, Optional
+from config.settings import Settings
+
+def pcm_hash(samples: np.ndarray, sample_rate: int) -> str:
+    """Identifies audio by its decoded samples, so the same recording in
+    another container or file name still hits the cache"""
+    digest = hashlib.sha256(str(sample_rate).encode())
+    digest.update(np.ascontiguousarray(samples, dtype=np.int16).data)
+    return digest.hexdigest()
+
+class ContentCache:
+    """Results of expensive audio processing keyed by content hash.
+
+    Entries are keyed by (kind, content hash, variant), where the variant
+    names whatever produced the result, such as the backend and its version,
+    so changing the backend misses instead of returning stale text. Values
+    are stored as JSON and the least recently used ones are evicted once the
+    cache grows past max_bytes. The cache lives in its own database file and
+    can be deleted at any time.
+    """
+
+    def __init__(self, db_path: str = Settings.CONTENT_CACHE_PATH,
+                 max_bytes: int = Settings.CONTENT_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.init_database()
+
+    def init_database(self):
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    kind TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    variant TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (kind, content_hash, variant)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_last_used ON cache_entries(last_used)
+            ''')
+            conn.commit()
+
+            cursor.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries')
+            self.total_bytes = cursor.fetchone()[0]
+
+    def get(self, kind: str, content_hash: str, variant: str) -> Optional[Any]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT rowid, value FROM cache_entries
+                WHERE kind = ? AND content_hash = ? AND variant = ?
+            ''', (kind, content_hash, variant))
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute('UPDATE cache_entries SET last_used = ? WHERE rowid = ?', (time.time(), row[0]))
+                conn.commit()
+
+        with self.lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, kind: str, content_hash: str, variant: str, value: Any):
+        encoded = json.dumps(value)
+        size = len(encoded) + len(content_hash) + len(kind) + len(variant)
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT size FROM cache_entries
+                    WHERE kind = ? AND content_hash = ? AND variant = ?
+                ''', (kind, content_hash, variant))
+                row = cursor.fetchone()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO cache_entries
+                        (kind, content_hash, variant, value, size, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (kind, content_hash, variant, encoded, size, time.time()))
+                self.total_bytes += size - (row[0] if row else 0)
+
+                if self.total_bytes > self.max_bytes:
+                    self._evict(cursor)
+                conn.commit()
+
+    def _evict(self, cursor):
+        # Drop the least recently used entries until we are back under budget
+        cursor.execute('SELECT rowid, size FROM cache_entries ORDER BY last_used')
+        doomed = []
+        for rowid, size in cursor.fetchall():
+            if self.total_bytes <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            self.total_bytes -= size
+        cursor.executemany('DELETE FROM cache_entries WHERE rowid = ?', doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('DELETE FROM cache_entries')
+                conn.commit()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+def get_content_cache() -> Optional[ContentCache]:
+    try:
+        return ContentCache()
+    except Exception as e:
+        print(f"Content cache unavailable, results will not be reused: {e}")
+        return None
@@ -1,169 +1,529 @@
 import sqlite3
 import datetime
-from typing import List, Optional, Dict, Any
+import json
+import re
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from config.settings import Settings
+from storage.connection import ConnectionManager
+from storage.migrations import migrate, rebuild_member_stats
+
+_SEARCH_WORD_RE = re.compile(r"\w+")
+
+def build_fts_query(text: str, prefix: bool = True) -> Optional[str]:
+    """Turn typed text into an FTS5 query where every word must match.
+    With prefix set, the last word may be unfinished unless followed by a space."""
+    words = _SEARCH_WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    # Quoting keeps FTS5 syntax (AND, NEAR, -, :) in the text from being parsed
+    terms = [f'"{word}"' for word in words]
+    if prefix and not text[-1:].isspace():
+        terms[-1] += "*"
+    return " ".join(terms)
+
+# Message listings, shared with check_query_plans() so the checked SQL is the SQL that runs
+MESSAGES_BY_MEMBER_QUERY = '''
+    SELECT * FROM messages
+    WHERE family_member = ? AND is_archived = FALSE
+    ORDER BY recorded_at DESC
+    LIMIT ?
+'''
+
+ALL_MESSAGES_QUERY = '''
+    SELECT * FROM messages
+    WHERE is_archived = FALSE
+    ORDER BY recorded_at DESC
+    LIMIT ?
+'''
+
+RECENT_MESSAGES_QUERY = '''
+    SELECT * FROM messages
+    WHERE recorded_at >= ? AND is_archived = FALSE
+    ORDER BY recorded_at DESC
+'''
+
+LISTING_QUERIES = {
+    'get_messages_by_family_member': (MESSAGES_BY_MEMBER_QUERY, ("CARRIE", 5)),
+    'get_all_messages': (ALL_MESSAGES_QUERY, (50,)),
+    'get_recent_messages': (RECENT_MESSAGES_QUERY, ("2000-01-01 00:00:00",)),
+}
 
 class DatabaseManager:
-    def __init__(self):
-        self.db_path = Settings.DATABASE_PATH
+    def __init__(self, db_path: Optional[str] = None, connections: Optional[ConnectionManager] = None):
+        self.db_path = db_path or Settings.DATABASE_PATH
+        self.connections = connections or ConnectionManager(self.db_path)
+        self.fts_available = False
         self.init_database()
 
-    def init_database(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def close(self):
+        self.connections.close_all()
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    family_member TEXT NOT NULL,
-                    filename TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    duration_seconds REAL,
-                    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    transcription TEXT,
-                    tags TEXT,
-                    is_archived BOOLEAN DEFAULT FALSE
-                )
-            ''')
+    def transaction(self):
+        """Group writes into one commit, and one fsync:
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            with database.transaction():
+                database.add_message(...)
+                database.archive_message(...)
 
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_family_member ON messages(family_member)
-            ''')
+        Methods called inside the block join its transaction; everything is
+        committed when the block exits, or rolled back if it raises. Don't
+        claim transcription jobs inside one; that takes its own write lock.
+        """
+        return self.connections.transaction()
 
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_recorded_at ON messages(recorded_at)
-            ''')
+    def init_database(self):
+        with self.connections.connection() as conn:
+            migrate(conn)
+            self.fts_available = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+            ).fetchone() is not None
 
-            conn.commit()
+    def check_query_plans(self) -> Dict[str, List[str]]:
+        """EXPLAIN QUERY PLAN steps that scan the whole table or sort in a
+        temporary B-tree, for each listing query; empty lists mean all is well"""
+        problems = {}
+        with self.connections.connection() as conn:
+            for name, (query, params) in LISTING_QUERIES.items():
+                steps = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params)]
+                problems[name] = [step for step in steps
+                                  if step.startswith('SCAN') or 'TEMP B-TREE' in step]
+        return problems
+
+    def check_member_stats(self) -> List[str]:
+        """Differences between member_stats and a fresh count of the messages
+        table, one line per member; an empty list means they agree"""
+        with self.connections.transaction() as conn:
+            expected = {row[0]: row[1:] for row in conn.execute('''
+                SELECT family_member, COUNT(*), COALESCE(SUM(duration_seconds), 0), MAX(recorded_at)
+                FROM messages
+                WHERE is_archived = FALSE
+                GROUP BY family_member
+            ''')}
+            actual = {row[0]: row[1:] for row in conn.execute('''
+                SELECT family_member, message_count, total_duration, last_recorded_at
+                FROM member_stats
+                WHERE message_count != 0
+            ''')}
+
+        problems = []
+        for member in sorted(set(expected) | set(actual)):
+            want = expected.get(member, (0, 0.0, None))
+            have = actual.get(member, (0, 0.0, None))
+            # Durations are added and taken away one message at a time
+            if want[0] != have[0] or abs(want[1] - have[1]) > 0.01 or want[2] != have[2]:
+                problems.append(f"{member}: expected {want[0]} messages, {want[1]:.2f}s, last {want[2]}; "
+                                f"have {have[0]} messages, {have[1]:.2f}s, last {have[2]}")
+        return problems
+
+    def rebuild_member_stats(self):
+        with self.connections.transaction() as conn:
+            rebuild_member_stats(conn.cursor())
 
     def add_message(self, family_member: str, filename: str, file_path: str,
                    duration_seconds: Optional[float] = None,
                    transcription: Optional[str] = None,
                    tags: Optional[str] = None) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO messages (family_member, filename, file_path, duration_seconds, transcription, tags)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (family_member.upper(), filename, file_path, duration_seconds, transcription, tags))
-            conn.commit()
             return cursor.lastrowid
 
+    def add_messages(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """Insert many messages in one transaction; returns their ids in order.
+
+        Each dict has the add_message() arguments as keys, and may also give
+        recorded_at for messages recorded before they were added and the
+        file's content_hash.
+        """
+        ids = []
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            for message in messages:
+                cursor.execute('''
+                    INSERT INTO messages
+                        (family_member, filename, file_path, duration_seconds, transcription, tags,
+                         recorded_at, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)
+                ''', (message['family_member'].upper(), message['filename'], message['file_path'],
+                      message.get('duration_seconds'), message.get('transcription'),
+                      message.get('tags'), message.get('recorded_at'), message.get('content_hash')))
+                ids.append(cursor.lastrowid)
+        return ids
+
     def get_messages_by_family_member(self, family_member: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-
-            query = '''
-                SELECT * FROM messages
-                WHERE family_member = ? AND is_archived = FALSE
-                ORDER BY recorded_at DESC
-            '''
-
-            if limit:
-                query += f' LIMIT {limit}'
-
-            cursor.execute(query, (family_member.upper(),))
+            # A placeholder keeps one compiled statement for every limit
+            cursor.execute(MESSAGES_BY_MEMBER_QUERY, (family_member.upper(), limit or -1))
             return [dict(row) for row in cursor.fetchall()]
 
     def get_all_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-
-            query = '''
-                SELECT * FROM messages
-                WHERE is_archived = FALSE
-                ORDER BY recorded_at DESC
-            '''
-
-            if limit:
-                query += f' LIMIT {limit}'
-
-            cursor.execute(query)
+            cursor.execute(ALL_MESSAGES_QUERY, (limit or -1,))
             return [dict(row) for row in cursor.fetchall()]
 
     def get_recent_messages(self, days: int = 7) -> List[Dict[str, Any]]:
         cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM messages
-                WHERE recorded_at >= ? AND is_archived = FALSE
-                ORDER BY recorded_at DESC
-            ''', (cutoff_date,))
+            cursor.execute(RECENT_MESSAGES_QUERY, (cutoff_date,))
             return [dict(row) for row in cursor.fetchall()]
 
     def update_message_transcription(self, message_id: int, transcription: str):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE messages
                 SET transcription = ?
                 WHERE id = ?
             ''', (transcription, message_id))
+
+    def update_transcriptions(self, transcriptions: Iterable[Tuple[int, str]]):
+        """Set many transcriptions, given as (message_id, transcription), in one transaction"""
+        with self.connections.transaction() as conn:
+            conn.executemany('''
+                UPDATE messages
+                SET transcription = ?
+                WHERE id = ?
+            ''', [(transcription, message_id) for message_id, transcription in transcriptions])
+
+    def update_message_tags(self, message_id: int, tags: Optional[str]):
+        self.update_tags([(message_id, tags)])
+
+    def update_tags(self, tags: Iterable[Tuple[int, Optional[str]]]):
+        """Set many messages' tags, given as (message_id, tags), in one transaction"""
+        with self.connections.transaction() as conn:
+            conn.executemany('''
+                UPDATE messages
+                SET tags = ?
+                WHERE id = ?
+            ''', [(message_tags, message_id) for message_id, message_tags in tags])
+
+    def update_message_duration(self, message_id: int, duration_seconds: float):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE messages
+                SET duration_seconds = ?
+                WHERE id = ?
+            ''', (duration_seconds, message_id))
+
+    def get_file_index(self) -> Dict[str, Dict[str, Any]]:
+        """Every message, archived or not, by file path, with what the
+        importer needs to know about it"""
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, file_path, duration_seconds, content_hash FROM messages')
+            return {row['file_path']: dict(row) for row in cursor.fetchall()}
+
+    def update_file_info(self, updates: Iterable[Tuple[int, Optional[float], Optional[str]]]):
+        """Fill in missing durations and set content hashes, given as
+        (message_id, duration_seconds, content_hash), in one transaction"""
+        with self.connections.transaction() as conn:
+            conn.executemany('''
+                UPDATE messages
+                SET duration_seconds = COALESCE(duration_seconds, ?), content_hash = ?
+                WHERE id = ?
+            ''', [(duration, content_hash, message_id) for message_id, duration, content_hash in updates])
+
+    def save_message_analysis(self, message_id: int, trim_start_seconds: float,
+                              trim_end_seconds: float, gain_db: float, peaks: List[float]):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO message_analysis
+                    (message_id, trim_start_seconds, trim_end_seconds, gain_db, peaks, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (message_id, trim_start_seconds, trim_end_seconds, gain_db, json.dumps(peaks)))
+
+    def get_message_analysis(self, message_id: int) -> Optional[Dict[str, Any]]:
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM message_analysis WHERE message_id = ?', (message_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            analysis = dict(row)
+            analysis['peaks'] = json.loads(analysis['peaks']) if analysis['peaks'] else []
+            return analysis
+
+    def save_transcription_segments(self, message_id: int, segments: List[Dict[str, Any]]):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM transcription_segments WHERE message_id = ?', (message_id,))
+            cursor.executemany('''
+                INSERT INTO transcription_segments
+                    (message_id, segment_index, start_seconds, end_seconds, text)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(message_id, segment['index'], segment['start'], segment['end'], segment['text'])
+                  for segment in segments])
+
+    def get_transcription_segments(self, message_id: int) -> List[Dict[str, Any]]:
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT segment_index, start_seconds, end_seconds, text
+                FROM transcription_segments
+                WHERE message_id = ?
+                ORDER BY segment_index
+            ''', (message_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def save_playback_position(self, message_id: int, position_seconds: float):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO playback_positions (message_id, position_seconds, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (message_id, position_seconds))
+
+    def clear_playback_position(self, message_id: int):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM playback_positions WHERE message_id = ?', (message_id,))
+
+    def get_playback_positions(self, message_ids: List[int]) -> Dict[int, float]:
+        if not message_ids:
+            return {}
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(message_ids))
+            cursor.execute(f'''
+                SELECT message_id, position_seconds FROM playback_positions
+                WHERE message_id IN ({placeholders})
+            ''', message_ids)
+            return dict(cursor.fetchall())
+
+    def record_play(self, message_id: int, family_member: str, played_at: float):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO play_history (message_id, family_member, played_at)
+                VALUES (?, ?, ?)
+            ''', (message_id, family_member.upper(), played_at))
+
+    def get_play_history(self, since: float) -> List[Dict[str, Any]]:
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT message_id, family_member, played_at FROM play_history
+                WHERE played_at >= ?
+                ORDER BY played_at DESC
+            ''', (since,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    # Transcription job queue. Times are Unix timestamps (time.time()).
+    def enqueue_transcription_job(self, message_id: int, file_path: str, priority: int = 0):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO transcription_jobs (message_id, file_path, priority)
+                VALUES (?, ?, ?)
+                ON CONFLICT(message_id) DO UPDATE SET
+                    file_path = excluded.file_path,
+                    priority = MAX(priority, excluded.priority),
+                    status = 'pending',
+                    attempts = 0,
+                    next_attempt_at = 0,
+                    last_error = NULL
+            ''', (message_id, file_path, priority))
+
+    def claim_next_transcription_job(self, now: float) -> Optional[Dict[str, Any]]:
+        conn = self.connections.connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            # IMMEDIATE takes the write lock up front so two workers cannot claim the same job
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('''
+                SELECT * FROM transcription_jobs
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY priority DESC, id
+                LIMIT 1
+            ''', (now,)).fetchone()
+
+            if row is None:
+                conn.commit()
+                return None
+
+            conn.execute('''
+                UPDATE transcription_jobs
+                SET status = 'running', attempts = attempts + 1, started_at = ?
+                WHERE id = ?
+            ''', (now, row['id']))
             conn.commit()
 
+            job = dict(row)
+            job['attempts'] += 1
+            job['started_at'] = now
+            return job
+        except Exception:
+            conn.rollback()
+            raise
+
+    def complete_transcription_job(self, job_id: int, finished_at: float, note: Optional[str] = None):
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE transcription_jobs
+                SET status = 'done', finished_at = ?, last_error = ?
+                WHERE id = ?
+            ''', (finished_at, note, job_id))
+
+    def fail_transcription_job(self, job_id: int, error: str, retry_at: Optional[float]):
+        # retry_at None gives up on the job for good
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE transcription_jobs
+                SET status = ?, next_attempt_at = COALESCE(?, next_attempt_at), last_error = ?
+                WHERE id = ?
+            ''', ('failed' if retry_at is None else 'pending', retry_at, error, job_id))
+
+    def reset_running_transcription_jobs(self) -> int:
+        # Jobs left running by a crash or power cut go back in the queue
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE transcription_jobs SET status = 'pending' WHERE status = 'running'")
+            return cursor.rowcount
+
+    def get_next_transcription_attempt_time(self) -> Optional[float]:
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(next_attempt_at) FROM transcription_jobs WHERE status = 'pending'")
+            return cursor.fetchone()[0]
+
+    def get_transcription_queue_depth(self) -> Dict[str, int]:
+        with self.connections.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT status, COUNT(*) FROM transcription_jobs GROUP BY status')
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def get_untranscribed_messages(self) -> List[Dict[str, Any]]:
+        # Messages with no transcription that have never been queued
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT m.* FROM messages m
+                LEFT JOIN transcription_jobs j ON j.message_id = m.id
+                WHERE m.transcription IS NULL AND m.is_archived = FALSE AND j.id IS NULL
+                ORDER BY m.recorded_at DESC
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+
     def archive_message(self, message_id: int):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE messages
                 SET is_archived = TRUE
                 WHERE id = ?
             ''', (message_id,))
-            conn.commit()
+
+    def archive_messages(self, message_ids: Iterable[int]):
+        with self.connections.transaction() as conn:
+            conn.executemany('''
+                UPDATE messages
+                SET is_archived = TRUE
+                WHERE id = ?
+            ''', [(message_id,) for message_id in message_ids])
 
     def delete_message(self, message_id: int):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM messages WHERE id = ?', (message_id,))
-            conn.commit()
+            cursor.execute('DELETE FROM message_analysis WHERE message_id = ?', (message_id,))
+            cursor.execute('DELETE FROM transcription_jobs WHERE message_id = ?', (message_id,))
+            cursor.execute('DELETE FROM transcription_segments WHERE message_id = ?', (message_id,))
+            cursor.execute('DELETE FROM playback_positions WHERE message_id = ?', (message_id,))
+            cursor.execute('DELETE FROM play_history WHERE message_id = ?', (message_id,))
 
     def get_family_member_count(self) -> Dict[str, int]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT family_member, COUNT(*) as count
-                FROM messages
-                WHERE is_archived = FALSE
-                GROUP BY family_member
-                ORDER BY count DESC
+                SELECT family_member, message_count
+                FROM member_stats
+                WHERE message_count > 0
+                ORDER BY message_count DESC
             ''')
             return {row[0]: row[1] for row in cursor.fetchall()}
 
-    def search_messages(self, query: str) -> List[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
+    def get_member_stats(self) -> List[Dict[str, Any]]:
+        """Message count, total duration and latest recording time for each
+        family member with unarchived messages, most messages first"""
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT family_member, message_count, total_duration, last_recorded_at
+                FROM member_stats
+                WHERE message_count > 0
+                ORDER BY message_count DESC
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+
+    def search_messages(self, query: str, limit: Optional[int] = 50, prefix: bool = True) -> List[Dict[str, Any]]:
+        """Messages whose transcription or tags match every word of query, best
+        match first. Each result has a 'snippet' with the matches in [brackets].
+        With prefix set the last word may be unfinished, for search as you type."""
+        if not self.fts_available:
+            return self._search_messages_like(query, limit)
+
+        match = build_fts_query(query, prefix)
+        if match is None:
+            return []
+
+        with self.connections.transaction() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            # Tags are chosen by hand, so a hit there counts double
+            cursor.execute('''
+                SELECT m.*,
+                       snippet(messages_fts, -1, '[', ']', '...', 12) AS snippet,
+                       bm25(messages_fts, 1.0, 2.0) AS score
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                WHERE messages_fts MATCH ? AND m.is_archived = FALSE
+                ORDER BY score
+                LIMIT ?
+            ''', (match, limit or -1))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _search_messages_like(self, query: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        with self.connections.transaction() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM messages
                 WHERE (transcription LIKE ? OR tags LIKE ?) AND is_archived = FALSE
                 ORDER BY recorded_at DESC
-            ''', (f'%{query}%', f'%{query}%'))
+                LIMIT ?
+            ''', (f'%{query}%', f'%{query}%', limit or -1))
             return [dict(row) for row in cursor.fetchall()]
 
     def set_setting(self, key: str, value: str):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO settings (key, value, updated_at)
                 VALUES (?, ?, CURRENT_TIMESTAMP)
             ''', (key, value))
-            conn.commit()
 
     def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
             result = cursor.fetchone()
@@ -1,19 +1,45 @@
 import os
-import wave
+import re
 import datetime
-from typing import Optional
+import hashlib
+from typing import Optional, Tuple
 from config.settings import Settings
+from audio.audio_io import AUDIO_EXTENSIONS, get_duration, get_recording_extension
+
+FILENAME_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+_GENERATED_FILENAME_RE = re.compile(r"^(?P<member>.+)_(?P<timestamp>\d{8}_\d{6})\.[A-Za-z0-9]+$")
+
+def file_content_hash(filepath: str) -> str:
+    """sha256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 class FileManager:
     def __init__(self):
         Settings.ensure_directories()
 
-    def generate_filename(self, family_member: str, extension: str = "wav") -> str:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    def generate_filename(self, family_member: str, extension: Optional[str] = None) -> str:
+        if extension is None:
+            extension = get_recording_extension()
+        timestamp = datetime.datetime.now().strftime(FILENAME_TIMESTAMP_FORMAT)
         safe_name = "".join(c for c in family_member if c.isalnum() or c in (' ', '-', '_')).rstrip()
         safe_name = safe_name.replace(' ', '_').upper()
         return f"{safe_name}_{timestamp}.{extension}"
 
+    def parse_filename(self, filename: str) -> Optional[Tuple[str, datetime.datetime]]:
+        """Family member and local recording time from a generate_filename() name"""
+        match = _GENERATED_FILENAME_RE.match(os.path.basename(filename))
+        if not match:
+            return None
+        try:
+            recorded_at = datetime.datetime.strptime(match.group('timestamp'), FILENAME_TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+        return match.group('member').replace('_', ' '), recorded_at
+
     def get_file_path(self, filename: str) -> str:
         return os.path.join(Settings.AUDIO_DIR, filename)
 
@@ -22,11 +48,7 @@ class FileManager:
 
     def get_audio_duration(self, filepath: str) -> Optional[float]:
         try:
-            with wave.open(filepath, 'rb') as wav_file:
-                frames = wav_file.getnframes()
-                sample_rate = wav_file.getframerate()
-                duration = frames / float(sample_rate)
-                return duration
+            return get_duration(filepath)
         except Exception as e:
             print(f"Error getting audio duration for {filepath}: {e}")
             return None
@@ -36,11 +58,11 @@ class FileManager:
         os.makedirs(member_dir, exist_ok=True)
         return member_dir
 
-    def get_all_audio_files(self) -> list:
+    def get_all_audio_files(self, directory: Optional[str] = None) -> list:
         audio_files = []
-        for root, dirs, files in os.walk(Settings.AUDIO_DIR):
+        for root, dirs, files in os.walk(directory or Settings.AUDIO_DIR):
             for file in files:
-                if file.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
+                if file.lower().endswith(AUDIO_EXTENSIONS):
                     audio_files.append(os.path.join(root, file))
         return audio_files
 
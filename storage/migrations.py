@@ -0,0 +1,275 @@
+import sqlite3
+from typing import Callable, List, Tuple
+
+# Each migration runs once, in order, inside its own transaction, and the
+# number of the last one applied is kept in PRAGMA user_version. Never edit
+# a migration that has shipped; add a new one.
+
+def _baseline_schema(cursor):
+    # Databases from before migrations already have all of this; IF NOT
+    # EXISTS lets them be adopted at version 1 unchanged
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            family_member TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            duration_seconds REAL,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            transcription TEXT,
+            tags TEXT,
+            is_archived BOOLEAN DEFAULT FALSE
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS message_analysis (
+            message_id INTEGER PRIMARY KEY,
+            trim_start_seconds REAL,
+            trim_end_seconds REAL,
+            gain_db REAL,
+            peaks TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_family_member ON messages(family_member)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_recorded_at ON messages(recorded_at)
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transcription_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL UNIQUE,
+            file_path TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transcription_jobs_ready
+        ON transcription_jobs(status, priority DESC, next_attempt_at)
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transcription_segments (
+            message_id INTEGER NOT NULL,
+            segment_index INTEGER NOT NULL,
+            start_seconds REAL NOT NULL,
+            end_seconds REAL NOT NULL,
+            text TEXT,
+            PRIMARY KEY (message_id, segment_index)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS playback_positions (
+            message_id INTEGER PRIMARY KEY,
+            position_seconds REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Times are Unix timestamps, like the job queue
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS play_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL,
+            family_member TEXT NOT NULL,
+            played_at REAL NOT NULL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_play_history_played_at ON play_history(played_at)
+    ''')
+
+def _search_index(cursor):
+    """Full-text index over transcriptions and tags, kept in step with
+    messages by triggers. Skipped where SQLite lacks FTS5; search then
+    falls back to LIKE."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'")
+    existed = cursor.fetchone() is not None
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                transcription, tags,
+                content='messages', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable, using LIKE search: {e}")
+        return
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts (rowid, transcription, tags)
+            VALUES (new.id, new.transcription, new.tags);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, transcription, tags)
+            VALUES ('delete', old.id, old.transcription, old.tags);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF transcription, tags ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, transcription, tags)
+            VALUES ('delete', old.id, old.transcription, old.tags);
+            INSERT INTO messages_fts (rowid, transcription, tags)
+            VALUES (new.id, new.transcription, new.tags);
+        END
+    ''')
+    if not existed:
+        # Index whatever was recorded before the index existed
+        cursor.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+def _message_listing_indexes(cursor):
+    # Equality columns first, then recorded_at in ORDER BY direction, so the
+    # listing queries read rows already in order with no sort step
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_member_listing
+        ON messages(family_member, is_archived, recorded_at DESC)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_listing
+        ON messages(is_archived, recorded_at DESC)
+    ''')
+    # Superseded by the two above
+    cursor.execute('DROP INDEX IF EXISTS idx_family_member')
+    cursor.execute('DROP INDEX IF EXISTS idx_recorded_at')
+
+def _content_hash(cursor):
+    # sha256 of the audio file, so a recording copied in under another name
+    # is recognised as one already in the library
+    cursor.execute('ALTER TABLE messages ADD COLUMN content_hash TEXT')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_content_hash ON messages(content_hash)
+    ''')
+
+def rebuild_member_stats(cursor):
+    """Recount member_stats from the messages table"""
+    cursor.execute('DELETE FROM member_stats')
+    cursor.execute('''
+        INSERT INTO member_stats (family_member, message_count, total_duration, last_recorded_at)
+        SELECT family_member, COUNT(*), COALESCE(SUM(duration_seconds), 0), MAX(recorded_at)
+        FROM messages
+        WHERE is_archived = FALSE
+        GROUP BY family_member
+    ''')
+
+def _member_stats(cursor):
+    # Per-member totals over unarchived messages, kept current by triggers so
+    # listing counts read one row per member instead of grouping every message
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS member_stats (
+            family_member TEXT PRIMARY KEY,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            total_duration REAL NOT NULL DEFAULT 0,
+            last_recorded_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS member_stats_insert AFTER INSERT ON messages
+        WHEN NOT NEW.is_archived BEGIN
+            INSERT INTO member_stats (family_member, message_count, total_duration, last_recorded_at)
+            VALUES (NEW.family_member, 1, COALESCE(NEW.duration_seconds, 0), NEW.recorded_at)
+            ON CONFLICT(family_member) DO UPDATE SET
+                message_count = message_count + 1,
+                total_duration = total_duration + excluded.total_duration,
+                last_recorded_at = CASE
+                    WHEN last_recorded_at IS NULL OR excluded.last_recorded_at > last_recorded_at
+                    THEN excluded.last_recorded_at ELSE last_recorded_at END;
+        END
+    ''')
+    # The latest recording left is found through idx_messages_member_listing
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS member_stats_delete AFTER DELETE ON messages
+        WHEN NOT OLD.is_archived BEGIN
+            UPDATE member_stats SET
+                message_count = message_count - 1,
+                total_duration = total_duration - COALESCE(OLD.duration_seconds, 0),
+                last_recorded_at = (SELECT MAX(recorded_at) FROM messages
+                                    WHERE family_member = OLD.family_member AND is_archived = FALSE)
+            WHERE family_member = OLD.family_member;
+        END
+    ''')
+    # Archiving, restoring, duration backfills and reassigning a message: take
+    # the old row out and put the new one in
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS member_stats_update
+        AFTER UPDATE OF family_member, is_archived, duration_seconds, recorded_at ON messages
+        WHEN OLD.family_member IS NOT NEW.family_member OR OLD.is_archived IS NOT NEW.is_archived
+            OR OLD.duration_seconds IS NOT NEW.duration_seconds OR OLD.recorded_at IS NOT NEW.recorded_at
+        BEGIN
+            UPDATE member_stats SET
+                message_count = message_count - 1,
+                total_duration = total_duration - COALESCE(OLD.duration_seconds, 0)
+            WHERE family_member = OLD.family_member AND NOT OLD.is_archived;
+            INSERT INTO member_stats (family_member, message_count, total_duration)
+            SELECT NEW.family_member, 1, COALESCE(NEW.duration_seconds, 0) WHERE NOT NEW.is_archived
+            ON CONFLICT(family_member) DO UPDATE SET
+                message_count = message_count + 1,
+                total_duration = total_duration + excluded.total_duration;
+            UPDATE member_stats SET
+                last_recorded_at = (SELECT MAX(recorded_at) FROM messages
+                                    WHERE family_member = member_stats.family_member AND is_archived = FALSE)
+            WHERE family_member IN (OLD.family_member, NEW.family_member);
+        END
+    ''')
+    rebuild_member_stats(cursor)
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "baseline schema", _baseline_schema),
+    (2, "full-text search index", _search_index),
+    (3, "composite indexes for message listings", _message_listing_indexes),
+    (4, "content hash of each recording", _content_hash),
+    (5, "per-member statistics", _member_stats),
+]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply every migration newer than the database; returns the new version"""
+    version = schema_version(conn)
+    for number, description, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            # IMMEDIATE so two processes starting together cannot both migrate
+            conn.execute('BEGIN IMMEDIATE')
+            if schema_version(conn) >= number:
+                conn.rollback()
+                continue
+            print(f"Applying database migration {number}: {description}")
+            apply(conn.cursor())
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+    return version
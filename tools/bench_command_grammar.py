@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Measure per-utterance command parse time as the roster and phrase set grow.
+
+Usage: python -m tools.bench_command_grammar [--rosters 15,150,1500] [--phrases 0,50,500]
+
+Each roster size adds made-up names to the real family list and each phrase
+count adds made-up intent phrases, so the numbers show how parsing scales
+rather than how fast today's small grammar is. "cold" parses with the word
+cache off; "warm" is the steady state once common words have been seen.
+Before timing, the real roster is checked against NAME_CASES: misheard
+names that should still be found, and ordinary words that must not be
+taken for a name. INTENT_CASES checks phrases that appear inside other
+requests. A wrong answer in either makes the run exit non-zero.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.family_names import FAMILY_MEMBERS
+from audio.command_grammar import CommandMatcher, INTENT_PHRASES
+
+UTTERANCES = [
+    "munin play carrie's messages",
+    "muninn play sassy's messages",
+    "play beau",
+    "play bea's messages",
+    "remember this for lizzie",
+    "play messages from lucky",
+    "hear from nic",
+    "record a message for jeanne",
+    "stop playing",
+    "what can you do",
+    "list",
+    "play the messages too",
+    "play something nice",
+    "play kerry",
+]
+
+# (utterance, family member expected, or None when no name should be acted on)
+NAME_CASES = [
+    ("play carrie's messages", "CARRIE"),
+    ("play kerry", "CARRIE"),
+    ("muninn play sassy's messages", "CASSIE"),
+    ("play messages from lucky", "LUKE"),
+    ("hear from nic", "NICK"),
+    ("play nicky", "NICK"),
+    ("record a message for jeanne", "JEAN"),
+    ("play charley", "CHARLIE"),
+    ("play something nice", None),
+    ("play the news", None),
+    ("play some music", None),
+    ("play the messages too", None),
+]
+
+# (utterance, intent expected)
+INTENT_CASES = [
+    ("play the last one", "play"),
+    ("play the next one", "play"),
+    ("hear the last one", "play"),
+    ("next one", "skip"),
+    ("last one", "previous"),
+    ("skip to the next one", "skip"),
+    ("play and remember this", "record"),
+]
+
+SYLLABLES = [consonant + vowel for consonant in ["b", "d", "f", "g", "j", "k", "l", "m", "n", "p", "r", "t", "v", "w", "br", "tr", "st"]
+             for vowel in ["a", "e", "i", "o", "u", "ie", "ar", "en"]]
+
+def made_up_words(count: int, rng: random.Random, taken: set) -> list:
+    words = []
+    while len(words) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        if word not in taken:
+            taken.add(word)
+            words.append(word)
+    return words
+
+def time_parses(matcher: CommandMatcher, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utterance in UTTERANCES:
+            matcher.match(utterance)
+    return (time.perf_counter() - start) / (rounds * len(UTTERANCES))
+
+def check_names(matcher: CommandMatcher) -> int:
+    failures = 0
+    for utterance, expected in NAME_CASES:
+        match = matcher.match(utterance)
+        if match.member != expected:
+            failures += 1
+            print(f"FAIL {utterance!r}: expected {expected}, got {match}")
+    print(f"{len(NAME_CASES) - failures}/{len(NAME_CASES)} name cases correct")
+    return failures
+
+def check_intents(matcher: CommandMatcher) -> int:
+    failures = 0
+    for utterance, expected in INTENT_CASES:
+        match = matcher.match(utterance)
+        if match.intent != expected:
+            failures += 1
+            print(f"FAIL {utterance!r}: expected {expected}, got {match}")
+    print(f"{len(INTENT_CASES) - failures}/{len(INTENT_CASES)} intent cases correct")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rosters', default="15,150,1500", help='comma separated roster sizes')
+    parser.add_argument('--phrases', default="0,50,500", help='comma separated extra phrase counts')
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    matcher = CommandMatcher()
+    failures = check_names(matcher) + check_intents(matcher)
+    print()
+
+    rng = random.Random(0)
+    taken = {member.lower() for member in FAMILY_MEMBERS}
+    extra_names = made_up_words(max(int(n) for n in args.rosters.split(",")), rng, taken)
+    extra_words = made_up_words(max(int(n) for n in args.phrases.split(",")) * 2, rng, taken)
+
+    print(f"{'roster':>7} {'phrases':>8} {'build ms':>9} {'cold us':>8} {'warm us':>8}")
+    for roster_size in (int(n) for n in args.rosters.split(",")):
+        members = FAMILY_MEMBERS + [name.upper() for name in extra_names[:max(0, roster_size - len(FAMILY_MEMBERS))]]
+        for phrase_count in (int(n) for n in args.phrases.split(",")):
+            extra_phrases = [" ".join(extra_words[2 * i:2 * i + 2]) for i in range(phrase_count)]
+            intents = INTENT_PHRASES + [("extra", extra_phrases)]
+
+            started = time.perf_counter()
+            cold = CommandMatcher(members, intents, cache_size=0)
+            build = time.perf_counter() - started
+            warm = CommandMatcher(members, intents)
+
+            cold_time = time_parses(cold, args.rounds)
+            time_parses(warm, 1)
+            warm_time = time_parses(warm, args.rounds)
+            print(f"{len(members):>7} {sum(len(p) for _, p in intents):>8} {build * 1000:>9.2f} "
+                  f"{cold_time * 1e6:>8.1f} {warm_time * 1e6:>8.1f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Measure per-query database overhead with a connection per call versus kept-open connections.
+
+Usage: python -m tools.bench_database [--messages 2000] [--rounds 500] [--batch 2000] [--dir /path/on/the/sd/card]
+
+"per call" is how DatabaseManager used to work: a fresh sqlite3.connect()
+for every method, in the default rollback-journal mode. "pooled" is the
+current per-thread ConnectionManager with WAL. The last row times reads
+while another thread writes continuously, which is where the journal mode
+matters. The second table times --batch writes made one call (and one
+commit) at a time against the bulk methods that commit once. Run it with
+--dir on the card the Pi uses; tmpfs hides fsync cost.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.family_names import FAMILY_MEMBERS
+from storage.connection import ConnectionManager
+from storage.database import DatabaseManager
+
+class PerCallConnections:
+    """The old behaviour: a new connection for every method call"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    @contextmanager
+    def transaction(self):
+        with sqlite3.connect(self.db_path) as conn:
+            yield conn
+
+    def close_all(self):
+        pass
+
+def populate(db_path: str, count: int):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+            INSERT INTO messages (family_member, filename, file_path, duration_seconds, transcription)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(FAMILY_MEMBERS[i % len(FAMILY_MEMBERS)], f"{i}.wav", f"/audio/{i}.wav", 30.0, f"message {i}")
+              for i in range(count)])
+
+def time_calls(call, rounds: int) -> float:
+    started = time.perf_counter()
+    for i in range(rounds):
+        call(i)
+    return (time.perf_counter() - started) / rounds
+
+def reads_during_writes(db: DatabaseManager, rounds: int) -> float:
+    """95th percentile read time while another thread keeps writing"""
+    reads = []
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            db.update_message_transcription(1 + i % 100, f"rewritten {i}")
+            i += 1
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    try:
+        for i in range(rounds):
+            started = time.perf_counter()
+            db.get_messages_by_family_member(FAMILY_MEMBERS[i % len(FAMILY_MEMBERS)], limit=5)
+            reads.append(time.perf_counter() - started)
+    finally:
+        stop.set()
+        thread.join()
+    reads.sort()
+    return reads[int(0.95 * (len(reads) - 1))]
+
+def run(db_path: str, connections_class, args) -> dict:
+    db = DatabaseManager(db_path, connections_class(db_path))
+    populate(db_path, args.messages)
+    members = FAMILY_MEMBERS
+
+    results = {
+        'get_messages_by_family_member': time_calls(
+            lambda i: db.get_messages_by_family_member(members[i % len(members)], limit=5), args.rounds),
+        'get_setting': time_calls(lambda i: db.get_setting("volume"), args.rounds),
+        'set_setting': time_calls(lambda i: db.set_setting("volume", str(i)), args.rounds),
+        'update_message_duration': time_calls(
+            lambda i: db.update_message_duration(1 + i % args.messages, float(i)), args.rounds),
+    }
+    results['p95 read during writes'] = reads_during_writes(db, args.rounds)
+    db.close()
+    return results
+
+def time_batch(write) -> float:
+    started = time.perf_counter()
+    write()
+    return time.perf_counter() - started
+
+def run_batches(db_path: str, count: int) -> list:
+    db = DatabaseManager(db_path)
+    rows = [{'family_member': FAMILY_MEMBERS[i % len(FAMILY_MEMBERS)], 'filename': f"{i}.wav",
+             'file_path': f"/audio/{i}.wav", 'duration_seconds': 30.0} for i in range(count)]
+    ids = []
+
+    def add_singly():
+        for row in rows:
+            ids.append(db.add_message(**row))
+
+    results = [
+        ('add', time_batch(add_singly), time_batch(lambda: db.add_messages(rows))),
+        ('transcription', time_batch(lambda: [db.update_message_transcription(i, f"text {i}") for i in ids]),
+         time_batch(lambda: db.update_transcriptions((i, f"bulk {i}") for i in ids))),
+        ('tags', time_batch(lambda: [db.update_message_tags(i, "family") for i in ids]),
+         time_batch(lambda: db.update_tags((i, "story") for i in ids))),
+        ('archive', time_batch(lambda: [db.archive_message(i) for i in ids[:count // 2]]),
+         time_batch(lambda: db.archive_messages(ids[count // 2:]))),
+    ]
+    db.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=2000, help='rows per bulk write')
+    parser.add_argument('--dir', default=None, help='where to create the test databases')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        before = run(os.path.join(directory, "per_call.db"), PerCallConnections, args)
+        after = run(os.path.join(directory, "pooled.db"), ConnectionManager, args)
+        batches = run_batches(os.path.join(directory, "batches.db"), args.batch)
+
+    print(f"{'query':<32} {'per call us':>12} {'pooled us':>10} {'speedup':>8}")
+    for name in before:
+        print(f"{name:<32} {before[name] * 1e6:>12.1f} {after[name] * 1e6:>10.1f} "
+              f"{before[name] / after[name] if after[name] else float('inf'):>7.1f}x")
+
+    print()
+    print(f"{args.batch} rows{'':<21} {'one by one s':>12} {'bulk s':>10} {'speedup':>8}")
+    for name, single, bulk in batches:
+        print(f"{name:<32} {single:>12.3f} {bulk:>10.3f} {single / bulk:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare recording size and encoder CPU cost for WAV, FLAC and Opus.
+
+Usage: python -m tools.bench_encoding [recording.wav] [--seconds N]
+
+Without a recording a synthetic voice-like signal is used, which compresses
+less predictably than real speech; pass a real story for representative sizes.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from audio.audio_io import FORMAT_EXTENSIONS, get_recording_format, read_pcm, get_duration
+from audio.encoder import EncoderStage
+
+def synthetic_speech(seconds: float, sample_rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    # Syllable-rate envelope with pauses between phrases
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.3)
+    signal = 6000 * voiced * envelope + rng.normal(0, 40, len(t))
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+def encode(samples: np.ndarray, sample_rate: int, audio_format: str, directory: str) -> dict:
+    filename = os.path.join(directory, f"bench.{FORMAT_EXTENSIONS[audio_format]}")
+    encoder = EncoderStage(filename, audio_format, channels=1, sample_rate=sample_rate)
+
+    chunk = Settings.CHUNK_SIZE
+    start = time.perf_counter()
+    for offset in range(0, len(samples), chunk):
+        encoder.write(samples[offset:offset + chunk].tobytes())
+    encoder.close()
+    wall = time.perf_counter() - start
+
+    return {
+        'format': audio_format,
+        'bytes': os.path.getsize(filename),
+        'cpu_seconds': encoder.cpu_seconds,
+        'wall_seconds': wall,
+        'max_queue_depth': encoder.max_queue_depth,
+        'decoded_duration': get_duration(filename),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', nargs='?', help='WAV/FLAC recording to encode')
+    parser.add_argument('--seconds', type=float, default=300.0, help='length of synthetic audio')
+    args = parser.parse_args()
+
+    if args.recording:
+        samples, sample_rate = read_pcm(args.recording)
+        source = args.recording
+    else:
+        sample_rate = Settings.SAMPLE_RATE
+        samples = synthetic_speech(args.seconds, sample_rate)
+        source = f"synthetic {args.seconds:.0f}s"
+
+    audio_seconds = len(samples) / float(sample_rate)
+    formats = [f for f in FORMAT_EXTENSIONS if get_recording_format(f) == f]
+
+    print(f"Source: {source} ({audio_seconds:.1f}s at {sample_rate} Hz)")
+    print(f"{'format':<6} {'size KB':>10} {'ratio':>7} {'CPU s':>8} {'CPU/audio':>10} {'queue max':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = None
+        for audio_format in formats:
+            result = encode(samples, sample_rate, audio_format, directory)
+            if baseline is None:
+                baseline = result['bytes']
+            print(f"{result['format']:<6} {result['bytes'] / 1024:>10.1f} "
+                  f"{baseline / result['bytes']:>6.1f}x {result['cpu_seconds']:>8.3f} "
+                  f"{100 * result['cpu_seconds'] / audio_seconds:>9.2f}% {result['max_queue_depth']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Measure message search latency with the FTS5 index versus the old LIKE scan.
+
+Usage: python -m tools.bench_search [--sizes 10000,100000] [--rounds 20] [--dir /path/on/the/sd/card]
+
+Each size builds a database of made-up transcriptions and tags, then times
+the same queries both ways: a rare word, a common word, two words, and a
+three-letter prefix as typed into a search box. "like" is the query
+search_messages ran before the index; "fts" is the ranked search with
+snippets, capped at 50 results.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.family_names import FAMILY_MEMBERS
+from storage.database import DatabaseManager
+
+COMMON_WORDS = ["love", "you", "miss", "today", "grandma", "remember", "when", "we", "the", "and"]
+TOPIC_WORDS = ["birthday", "fishing", "garden", "recital", "christmas", "vacation", "school",
+               "baseball", "wedding", "puppy", "recipe", "camping", "graduation", "snow"]
+TAGS = ["family", "holiday", "funny", "story", "music", "advice"]
+
+QUERIES = [
+    ("rare word", "zeppelin"),
+    ("common word", "love"),
+    ("two words", "fishing garden"),
+    ("prefix", "gra"),
+]
+
+def make_transcription(rng: random.Random, index: int) -> str:
+    words = [rng.choice(COMMON_WORDS) for _ in range(rng.randint(20, 60))]
+    for _ in range(rng.randint(1, 3)):
+        words.insert(rng.randrange(len(words)), rng.choice(TOPIC_WORDS))
+    if index % 5000 == 0:
+        words.append("zeppelin")
+    return " ".join(words)
+
+def build(db_path: str, count: int) -> DatabaseManager:
+    db = DatabaseManager(db_path)
+    rng = random.Random(count)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+            INSERT INTO messages (family_member, filename, file_path, transcription, tags)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(FAMILY_MEMBERS[i % len(FAMILY_MEMBERS)], f"{i}.wav", f"/audio/{i}.wav",
+               make_transcription(rng, i), ", ".join(rng.sample(TAGS, 2)))
+              for i in range(count)])
+    return db
+
+def like_search(db: DatabaseManager, query: str):
+    with db.connections.connection() as conn:
+        return conn.execute('''
+            SELECT * FROM messages
+            WHERE (transcription LIKE ? OR tags LIKE ?) AND is_archived = FALSE
+            ORDER BY recorded_at DESC
+        ''', (f'%{query}%', f'%{query}%')).fetchall()
+
+def time_query(search, rounds: int) -> float:
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        search()
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return times[len(times) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default="10000,100000", help='comma separated message counts')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--dir', default=None, help='where to create the test databases')
+    args = parser.parse_args()
+
+    print(f"{'messages':>9} {'query':<12} {'like ms':>9} {'fts ms':>8} {'speedup':>8} {'hits':>6}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for size in (int(n) for n in args.sizes.split(",")):
+            db = build(os.path.join(directory, f"search_{size}.db"), size)
+            if not db.fts_available:
+                print("FTS5 is not available in this SQLite build")
+                return 1
+            for label, query in QUERIES:
+                like = time_query(lambda: like_search(db, query), args.rounds)
+                fts = time_query(lambda: db.search_messages(query), args.rounds)
+                hits = len(db.search_messages(query, limit=None))
+                print(f"{size:>9} {label:<12} {like * 1000:>9.2f} {fts * 1000:>8.2f} "
+                      f"{like / fts:>7.1f}x {hits:>6}")
+            db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Measure the real-time factor of each speech-to-text backend.
+
+Usage: python -m tools.bench_stt [--backends google,vosk,standin] RECORDING [RECORDING ...]
+
+A real-time factor below 1.0 means the backend transcribes faster than the
+audio plays; on the Pi pick the fastest backend that stays well under it.
+"""
+
+import argparse
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from audio.audio_io import read_pcm
+from audio.stt_backends import BACKENDS, TranscriptionError
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recordings', nargs='+')
+    parser.add_argument('--backends', default=",".join(BACKENDS), help='comma separated backend names')
+    args = parser.parse_args()
+
+    audio = [(path, *read_pcm(path)) for path in args.recordings]
+
+    print(f"{'backend':<10} {'audio s':>9} {'process s':>10} {'RTF':>7}  first result")
+    for name in args.backends.split(","):
+        try:
+            backend = BACKENDS[name.strip()]()
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+
+        first = None
+        for path, samples, sample_rate in audio:
+            try:
+                text = backend.transcribe(samples.tobytes(), sample_rate)
+            except TranscriptionError as e:
+                text = f"<error: {e}>"
+            if first is None:
+                first = text
+
+        stats = backend.get_stats()
+        print(f"{name:<10} {stats['audio_seconds']:>9.1f} {stats['processing_seconds']:>10.2f} "
+              f"{stats['real_time_factor']:>7.3f}  {first}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Check that the member_stats summary table agrees with the messages table, and rebuild it if not.
+
+Usage: python -m tools.check_member_stats [--db muninn.db] [--rebuild]
+
+member_stats holds each family member's unarchived message count, total
+duration and latest recording time, kept current by triggers on the
+messages table. This recounts from messages and prints any member whose
+summary differs; it exits non-zero if one does. --rebuild recounts the
+whole table afterwards, which also clears float drift in the totals.
+"""
+
+import argparse
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from storage.database import DatabaseManager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=Settings.DATABASE_PATH)
+    parser.add_argument('--rebuild', action='store_true', help='recount member_stats from messages')
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    problems = db.check_member_stats()
+    for problem in problems:
+        print(f"MISMATCH {problem}")
+    if not problems:
+        print("member_stats agrees with messages")
+
+    if args.rebuild:
+        db.rebuild_member_stats()
+        problems = db.check_member_stats()
+        print("Rebuilt member_stats" + (f", {len(problems)} members still differ" if problems else ""))
+    db.close()
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Check that recording post-processing trims and levels speech and leaves everything else alone.
+
+Usage: python -m tools.check_postprocess
+
+Writes synthetic recordings to a temporary directory and runs
+process_recording() on each: a burst of speech-like tone between silences
+must be trimmed and brought towards POSTPROCESS_TARGET_DBFS, while
+noise-only and silent recordings must come out byte for byte unchanged.
+Exits non-zero if any check fails. Run it after changing the VAD or the
+post-processing settings.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from audio.audio_io import read_pcm, write_pcm
+from audio.postprocess import process_recording
+
+SAMPLE_RATE = Settings.SAMPLE_RATE
+
+def quiet_speech() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    # Voiced-sounding tone with a syllable-rate envelope
+    voice = np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)) * 1500
+    silence = rng.normal(0, 20, SAMPLE_RATE)
+    return np.concatenate([silence, voice, silence]).astype(np.int16)
+
+def noise_only() -> np.ndarray:
+    return np.random.default_rng(2).normal(0, 200, 3 * SAMPLE_RATE).astype(np.int16)
+
+def near_silence() -> np.ndarray:
+    return np.random.default_rng(3).normal(0, 3, 3 * SAMPLE_RATE).astype(np.int16)
+
+def check_unchanged(directory: str, name: str, samples: np.ndarray) -> list:
+    path = os.path.join(directory, f"{name}.wav")
+    write_pcm(path, samples, SAMPLE_RATE)
+    with open(path, 'rb') as f:
+        before = f.read()
+    result = process_recording(path)
+    with open(path, 'rb') as f:
+        after = f.read()
+
+    problems = []
+    if after != before:
+        problems.append(f"{name}: file was rewritten")
+    if abs(result['gain_db']) > 0.01:
+        problems.append(f"{name}: gain {result['gain_db']:.1f} dB applied")
+    return problems
+
+def check_speech(directory: str) -> list:
+    path = os.path.join(directory, "speech.wav")
+    samples = quiet_speech()
+    write_pcm(path, samples, SAMPLE_RATE)
+    result = process_recording(path)
+    output, _ = read_pcm(path)
+
+    problems = []
+    if result['duration'] >= len(samples) / SAMPLE_RATE - 0.5:
+        problems.append(f"speech: silence not trimmed ({result['duration']:.2f}s left)")
+    if result['gain_db'] <= 0:
+        problems.append(f"speech: quiet speech not raised ({result['gain_db']:.1f} dB)")
+    if np.max(np.abs(output.astype(np.int32))) >= 32767:
+        problems.append("speech: output clips")
+    return problems
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        problems = check_speech(directory)
+        problems += check_unchanged(directory, "noise", noise_only())
+        problems += check_unchanged(directory, "near_silence", near_silence())
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if not problems:
+        print("ok   post-processing")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Check that the message listing queries use an index with no full scan or sort step.
+
+Usage: python -m tools.check_query_plans [--db muninn.db]
+
+Runs EXPLAIN QUERY PLAN for each listing query against a migrated copy of
+the schema (a fresh temporary database unless --db is given) and exits
+non-zero if any of them scans the messages table or sorts in a temporary
+B-tree. Run it after changing a listing query or an index.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from storage.database import DatabaseManager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=None, help='database to check; migrated first if it is behind')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(args.db or os.path.join(directory, "plans.db"))
+        problems = db.check_query_plans()
+        db.close()
+
+    failed = False
+    for name, steps in problems.items():
+        if steps:
+            failed = True
+            print(f"FAIL {name}: {'; '.join(steps)}")
+        else:
+            print(f"ok   {name}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
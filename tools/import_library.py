@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Import audio files already on disk into the message database, and backfill missing details.
+
+Usage: python -m tools.import_library [--dir audio_files] [--workers N] [--batch 500]
+                                      [--checkpoint import_checkpoint.txt] [--restart] [--dry-run]
+
+Walks the audio directory and takes the family member and recording time
+from the FileManager.generate_filename() name (MEMBER_YYYYMMDD_HHMMSS.ext).
+Files named some other way are taken from the member's folder, as laid out
+by organize_by_family_member(), with the file's modification time. Each
+file's duration and content hash are computed in a process pool, one
+worker per core by default; files whose recording is already in the
+database under another path are skipped as duplicates. Only missing rows
+are inserted, each --batch in one transaction, and existing rows without a
+duration or hash are filled in.
+
+Every path handled is appended to the checkpoint file once its batch is
+committed, so an interrupted import picks up where it stopped; files that
+could not be read are left out so the next run tries them again. --restart
+forgets the checkpoint. Imported messages are transcribed by the
+transcription queue's backlog pass the next time Muninn starts.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.family_names import FAMILY_MEMBERS
+from config.settings import Settings
+from storage.database import DatabaseManager
+from storage.file_manager import FileManager, file_content_hash
+from audio.audio_io import get_duration
+
+def inspect_file(file_path: str) -> Tuple[str, Optional[float], Optional[str], Optional[str]]:
+    """Runs in a worker process: (path, duration, content hash, error)"""
+    try:
+        return file_path, get_duration(file_path), file_content_hash(file_path), None
+    except Exception as e:
+        return file_path, None, None, str(e) or type(e).__name__
+
+def load_checkpoint(checkpoint_path: str) -> set:
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, 'r') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def save_checkpoint(checkpoint, file_paths: list):
+    checkpoint.write(''.join(f"{file_path}\n" for file_path in file_paths))
+    checkpoint.flush()
+    os.fsync(checkpoint.fileno())
+
+def recorded_at_for(file_manager: FileManager, file_path: str, audio_dir: str) -> Optional[Tuple[str, str]]:
+    """Family member and UTC recorded_at for a file, or None if it can't be told"""
+    parsed = file_manager.parse_filename(file_path)
+    if parsed:
+        member, recorded = parsed
+    else:
+        folder = os.path.dirname(os.path.abspath(file_path))
+        if folder == os.path.abspath(audio_dir):
+            return None
+        member = os.path.basename(folder)
+        recorded = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
+
+    member = member.upper()
+    if member not in FAMILY_MEMBERS:
+        return None
+    # Filenames carry local time; the database stores CURRENT_TIMESTAMP, which is UTC
+    utc = recorded.astimezone(datetime.timezone.utc)
+    return member, utc.strftime('%Y-%m-%d %H:%M:%S')
+
+def format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dir', default=Settings.AUDIO_DIR, help='audio directory to walk')
+    parser.add_argument('--db', default=Settings.DATABASE_PATH)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch', type=int, default=500, help='files per transaction')
+    parser.add_argument('--checkpoint', default=os.path.join(Settings.BASE_DIR, "import_checkpoint.txt"))
+    parser.add_argument('--restart', action='store_true', help='ignore and replace the checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change without writing')
+    args = parser.parse_args()
+
+    file_manager = FileManager()
+    db = DatabaseManager(args.db)
+    if args.restart and os.path.exists(args.checkpoint) and not args.dry_run:
+        os.remove(args.checkpoint)
+    done = set() if args.restart else load_checkpoint(args.checkpoint)
+
+    known = db.get_file_index()
+    known_hashes = {row['content_hash'] for row in known.values() if row['content_hash']}
+    to_inspect = []
+    # Properly named files first, so they win over renamed copies of the same recording
+    file_paths = sorted((os.path.abspath(file_path) for file_path in file_manager.get_all_audio_files(args.dir)),
+                        key=lambda file_path: (file_manager.parse_filename(file_path) is None, file_path))
+    for file_path in file_paths:
+        if file_path in done:
+            continue
+        row = known.get(file_path)
+        if row is None or row['duration_seconds'] is None or row['content_hash'] is None:
+            to_inspect.append(file_path)
+
+    total = len(to_inspect)
+    print(f"{total} files to inspect with {args.workers} workers ({len(done)} already checkpointed)")
+    if not total:
+        db.close()
+        return 0
+
+    counts = {'imported': 0, 'backfilled': 0, 'duplicate': 0, 'unrecognised': 0, 'failed': 0}
+    additions, updates, handled = [], [], []
+    processed = 0
+    started = time.perf_counter()
+    checkpoint = None if args.dry_run else open(args.checkpoint, 'a')
+
+    def flush():
+        if not args.dry_run and (additions or updates):
+            with db.transaction():
+                db.add_messages(additions)
+                db.update_file_info(updates)
+        if checkpoint:
+            save_checkpoint(checkpoint, handled)
+        additions.clear()
+        updates.clear()
+        handled.clear()
+
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0.0
+        eta = (total - processed) / rate if rate else 0.0
+        print(f"{processed}/{total} files, {rate:.0f}/s, eta {format_eta(eta)} | "
+              + ", ".join(f"{name} {count}" for name, count in counts.items()))
+
+    try:
+        chunksize = max(1, min(64, total // (args.workers * 8)))
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for file_path, duration, content_hash, error in pool.map(inspect_file, to_inspect,
+                                                                     chunksize=chunksize):
+                processed += 1
+                row = known.get(file_path)
+                if error is not None:
+                    print(f"Error reading {file_path}: {error}")
+                    counts['failed'] += 1
+                elif row is not None:
+                    updates.append((row['id'], duration, content_hash))
+                    known_hashes.add(content_hash)
+                    counts['backfilled'] += 1
+                elif content_hash in known_hashes:
+                    counts['duplicate'] += 1
+                else:
+                    details = recorded_at_for(file_manager, file_path, args.dir)
+                    if details is None:
+                        counts['unrecognised'] += 1
+                    else:
+                        member, recorded_at = details
+                        additions.append({'family_member': member, 'filename': os.path.basename(file_path),
+                                          'file_path': file_path, 'duration_seconds': duration,
+                                          'recorded_at': recorded_at, 'content_hash': content_hash})
+                        known_hashes.add(content_hash)
+                        counts['imported'] += 1
+
+                # Files that failed stay out of the checkpoint, so the next run tries them again
+                if error is None:
+                    handled.append(file_path)
+                if processed % args.batch == 0:
+                    flush()
+            # Unless the last batch ended exactly on the last file and was already flushed
+            if processed % args.batch:
+                flush()
+    except KeyboardInterrupt:
+        print("Interrupted; run again to carry on from the last committed batch")
+        return 1
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        db.close()
+
+    if args.dry_run:
+        print("Dry run: nothing was written")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Replay recordings through the wake word detector without a microphone.
+
+Usage: python -m tools.replay_wake_word [--engine standin|porcupine] PATH [PATH ...]
+
+PATH may be a recording or a directory of them. Utterances are read from an
+Audacity label file with the same name (clip.wav -> clip.txt, one
+"start<TAB>end[<TAB>label]" line per spoken wake word). Detections outside
+every labelled utterance count as false accepts.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from audio.audio_io import AUDIO_EXTENSIONS
+from audio.wake_word_replay import EnergyKeywordEngine, replay_files
+
+def collect_paths(paths):
+    collected = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                collected.extend(os.path.join(root, f) for f in sorted(files)
+                                 if f.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            collected.append(path)
+    return collected
+
+def create_engine(name: str, sensitivity: float):
+    if name == "standin":
+        return EnergyKeywordEngine()
+
+    import pvporcupine
+    keyword_args = {'keyword_paths': [Settings.WAKE_WORD_MODEL_PATH]}
+    if not os.path.exists(Settings.WAKE_WORD_MODEL_PATH):
+        keyword_args = {'keywords': [Settings.WAKE_WORD]}
+    return pvporcupine.create(
+        access_key=Settings.PICOVOICE_ACCESS_KEY,
+        sensitivities=[sensitivity],
+        **keyword_args
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='recordings or directories to replay')
+    parser.add_argument('--engine', choices=['standin', 'porcupine'], default='standin')
+    parser.add_argument('--sensitivity', type=float, default=0.5, help='Porcupine sensitivity')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='seconds after an utterance ends that a detection still counts')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args()
+
+    paths = collect_paths(args.paths)
+    if not paths:
+        print("No recordings found")
+        return 1
+
+    report = replay_files(paths, create_engine(args.engine, args.sensitivity), args.tolerance)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"\n{'='*60}")
+    for result in report['files']:
+        print(f"{os.path.basename(result['path'])}: {result['duration']:.1f}s, "
+              f"{len(result['hits'])}/{result['labelled']} detected, "
+              f"{len(result['false_accepts'])} false accepts")
+        for hit in result['hits']:
+            print(f"  hit at {hit['offset']:.2f}s (utterance ended {hit['utterance_end']:.2f}s, "
+                  f"latency {hit['latency'] * 1000:.0f}ms)")
+        for offset in result['false_accepts']:
+            print(f"  false accept at {offset:.2f}s")
+        for start, end in result['misses']:
+            print(f"  missed {start:.2f}-{end:.2f}s")
+
+    print(f"{'='*60}")
+    print(f"Audio replayed: {report['audio_seconds']:.1f}s in {report['wall_seconds']:.2f}s "
+          f"({report['speedup']:.0f}x real time, {report['cpu_seconds']:.2f}s CPU)")
+    if report['detection_rate'] is not None:
+        print(f"Detection rate: {report['detection_rate'] * 100:.1f}%")
+    print(f"False accepts: {report['false_accepts']} ({report['false_accepts_per_hour']:.2f}/hour)")
+
+    for label, key in (("Frame processing", 'frame_processing'), ("Queue lag", 'queue_lag'),
+                       ("Utterance end to callback", 'latency')):
+        stats = report[key]
+        print(f"{label}: n={stats['count']} mean={stats['mean_ms']:.3f}ms "
+              f"p95<={stats['p95_ms']:.3f}ms max={stats['max_ms']:.3f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())